@@ -1,7 +1,10 @@
 """Convenience functions for activity monitoring (use singleton)."""
 
-from datetime import datetime, timezone
+import asyncio
+import time
 
+from ..docker_utils import get_executor
+from .model import epoch_seconds
 from .monitor import ActivityMonitor
 
 
@@ -51,44 +54,56 @@ def reset_all_activity_data():
     return ActivityMonitor.get_instance().reset_all()
 
 
-def record_samples_for_all_users(db, find_user_func):
+async def record_samples_for_all_users(db, users):
     """Record activity samples for ALL users (active and offline).
 
+    The hub ORM walk stays on the event loop (the hub session is not thread-safe);
+    the activity-DB write and tick summary run on the shared executor so a slow
+    SQLite commit never stalls request serving.
+
     Args:
         db: JupyterHub database session (handler.db)
-        find_user_func: Function to find user by name (handler.find_user)
+        users: The hub's user dict (handler.users); live users are wrapped from
+            the loaded ORM row through it, not re-looked-up by name
 
     Returns:
         dict with counts: {'total': N, 'active': N, 'inactive': N, 'offline': N}
     """
     from jupyterhub import orm
+    from sqlalchemy.orm import selectinload
 
     monitor = ActivityMonitor.get_instance()
     inactive_threshold = monitor.inactive_after_minutes * 60
-    now = datetime.now(timezone.utc)
+    now = int(time.time())
 
     counts = {'total': 0, 'active': 0, 'inactive': 0, 'offline': 0}
-
-    for orm_user in db.query(orm.User).all():
-        user = find_user_func(orm_user.name)
-        if not user:
-            continue
-
-        spawner = user.spawner
-        server_active = spawner.active if spawner else False
-
+    samples = []
+
+    # Spawner rows are loaded with the users in one extra SELECT ... IN. Only users
+    # whose default spawner holds a server row are wrapped (users[orm_user] reuses
+    # the loaded row - find_user would re-SELECT each one by name) for the live
+    # active check; offline users are sampled straight from the ORM row, so the tick
+    # never materialises a Spawner for them.
+    for orm_user in db.query(orm.User).options(selectinload(orm.User._orm_spawners)).all():
+        orm_spawner = next((s for s in orm_user._orm_spawners if s.name == ''), None)
+        server_active = False
+        if orm_spawner is not None and orm_spawner.server_id is not None:
+            spawner = users[orm_user].spawner
+            server_active = spawner.active if spawner else False
+
+        # JupyterHub stores naive UTC; convert once to the epoch seconds the sample
+        # column holds, so the elapsed check is integer math and the bulk insert
+        # binds the value as-is
         last_activity = None
-        if spawner and spawner.orm_spawner:
-            last_activity = spawner.orm_spawner.last_activity
-            if last_activity and last_activity.tzinfo is None:
-                last_activity = last_activity.replace(tzinfo=timezone.utc)
+        if orm_spawner is not None:
+            last_activity = epoch_seconds(orm_spawner.last_activity)
 
-        monitor.record_sample(user.name, last_activity)
+        samples.append((orm_user.name, last_activity))
         counts['total'] += 1
 
         if server_active:
             if last_activity:
-                elapsed = (now - last_activity).total_seconds()
+                elapsed = now - last_activity
                 if elapsed <= inactive_threshold:
                     counts['active'] += 1
                 else:
@@ -98,11 +113,16 @@ def record_samples_for_all_users(db, find_user_func):
         else:
             counts['offline'] += 1
 
-    monitor.log_activity_tick(
-        counts['total'],
-        counts['active'],
-        counts['inactive'],
-        counts['offline'],
-    )
+    def _write():
+        monitor.record_samples_bulk(samples)
+        monitor.log_activity_tick(
+            counts['total'],
+            counts['active'],
+            counts['inactive'],
+            counts['offline'],
+            usernames=[username for username, _ in samples],
+        )
+
+    await asyncio.get_running_loop().run_in_executor(get_executor(), _write)
 
     return counts
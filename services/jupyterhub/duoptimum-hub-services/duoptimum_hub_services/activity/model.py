@@ -1,21 +1,128 @@
 """ActivitySample ORM model - single source of truth for both hub process and service."""
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
+import math
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, Boolean, Index, create_engine, event
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.types import TypeDecorator
 
 ActivityBase = declarative_base()
 
 
+class EpochSeconds(TypeDecorator):
+    """UTC instant stored as integer epoch seconds.
+
+    Window filters and the decay-age arithmetic compare plain integers inside SQLite
+    instead of parsing DateTime strings. Binds accept an epoch int (the write paths'
+    fast case) or a datetime (naive = UTC); reads return an aware UTC datetime.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return epoch_seconds(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else datetime.fromtimestamp(value, timezone.utc)
+
+
+def epoch_seconds(value):
+    """Integer epoch seconds for a datetime (naive = UTC) or number; None passes through."""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
 class ActivitySample(ActivityBase):
     """Database model for storing user activity samples."""
     __tablename__ = 'activity_samples'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    username = Column(String(255), nullable=False, index=True)
-    timestamp = Column(DateTime, nullable=False, index=True)
-    last_activity = Column(DateTime, nullable=True)
+    username = Column(String(255), nullable=False)
+    timestamp = Column(EpochSeconds, nullable=False, index=True)  # retention prune
+    last_activity = Column(EpochSeconds, nullable=True)
     active = Column(Boolean, default=False)
 
     __table_args__ = (
-        Index('ix_activity_user_time', 'username', 'timestamp'),
+        # covering index for scoring: per-user window scans read active from the index
+        # alone, and its username prefix serves the rename/delete lookups
+        Index('ix_activity_user_time_active', 'username', 'timestamp', 'active'),
     )
+
+
+# Indexes earlier schemas created that the covering index above supersedes.
+_OBSOLETE_INDEXES = ('ix_activity_user_time', 'ix_activity_samples_username')
+
+# Stored in the DB file's PRAGMA user_version once _ensure_schema has converted it:
+# 1 = epoch-second timestamps, covering index only.
+_SCHEMA_VERSION = 1
+
+
+# Applied to every new SQLite connection. WAL lets the hub's readers run alongside the
+# sampler's writes and, with synchronous=NORMAL, drops the per-commit fsync of the
+# default rollback journal; the rest keep temp B-trees and ~20MB of pages in memory
+# and wait out a concurrent writer instead of failing with "database is locked".
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def _on_connect(dbapi_connection, connection_record):
+    # exp() for the in-SQL decay weighting - SQLite's own math functions are a
+    # compile-time option, so register one rather than depend on the build
+    dbapi_connection.create_function("dexp", 1, math.exp, deterministic=True)
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def create_activity_engine(db_url, **kwargs):
+    """Engine for the activity DB with the SQLite pragmas and SQL functions set up
+    on connect and the schema created."""
+    engine = create_engine(db_url, **kwargs)
+    event.listen(engine, "connect", _on_connect)
+    ActivityBase.metadata.create_all(engine)
+    _ensure_schema(engine)
+    return engine
+
+
+def _ensure_schema(engine):
+    """Bring an existing DB's indexes and storage in line with the model, once.
+
+    create_all skips tables that already exist - indexes included - so new indexes
+    are created here and superseded ones (each one is extra work on every insert)
+    dropped. Rows written before timestamps became epoch seconds hold DateTime text
+    (naive UTC); they are converted in place. SQLite's column types are advisory, so
+    the old DATETIME declaration holds integers fine.
+
+    The conversion scans the whole table, so it is gated on PRAGMA user_version and
+    only runs while the file is below _SCHEMA_VERSION (bump it when the model's
+    indexes or storage change). Every start then only runs PRAGMA optimize, which
+    re-analyzes just the tables whose statistics have drifted."""
+    with engine.begin() as conn:
+        if conn.exec_driver_sql('PRAGMA user_version').scalar() < _SCHEMA_VERSION:
+            for column in ('timestamp', 'last_activity'):
+                conn.exec_driver_sql(
+                    f"UPDATE activity_samples SET {column} = CAST(strftime('%s', {column}) AS INTEGER) "
+                    f"WHERE typeof({column}) = 'text'"
+                )
+            for index in ActivitySample.__table__.indexes:
+                index.create(conn, checkfirst=True)
+            for name in _OBSOLETE_INDEXES:
+                conn.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+            conn.exec_driver_sql('ANALYZE')
+            conn.exec_driver_sql(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+        conn.exec_driver_sql('PRAGMA optimize')
@@ -3,13 +3,13 @@
 import math
 import os
 import threading
-from datetime import datetime, timedelta, timezone
+import time
 
-from sqlalchemy import create_engine, func
+from sqlalchemy import case, func, literal
 from sqlalchemy.orm import sessionmaker
 
 from ..logging_setup import log
-from .model import ActivityBase, ActivitySample
+from .model import ActivitySample, create_activity_engine, epoch_seconds
 
 
 class ActivityMonitor:
@@ -18,6 +18,7 @@ class ActivityMonitor:
     Usage:
         monitor = ActivityMonitor.get_instance()
         monitor.record_sample(username, last_activity)
+        monitor.record_samples_bulk([(username, last_activity), ...])
         score, count = monitor.get_score(username)
         monitor.rename_user(old_name, new_name)
         monitor.delete_user(username)
@@ -31,11 +32,17 @@ class ActivityMonitor:
     DEFAULT_INACTIVE_AFTER = 60
     DEFAULT_ACTIVITY_UPDATE_INTERVAL = 600
     DEFAULT_TARGET_HOURS = 8  # daily active hours that count as a full (100%) score
+    DEFAULT_PRUNE_INTERVAL = 3600  # seconds between retention prunes on the write path
+    SCORE_CACHE_TTL = 60  # seconds a computed active fraction is reused
 
     def __init__(self):
-        self._db_session = None
+        self._session_factory = None
         self._engine = None
         self._initialized = False
+        # username -> (expires_at, (active_fraction, sample_count)). Cleared on every
+        # write through this monitor; the TTL bounds staleness from the sampler
+        # service, which writes the same DB from its own process.
+        self._fraction_cache = {}
 
         self.retention_days = self._get_env_int(
             "JUPYTERHUB_ACTIVITYMON_RETENTION_DAYS", self.DEFAULT_RETENTION_DAYS, 1, 365)
@@ -47,6 +54,10 @@ class ActivityMonitor:
             "JUPYTERHUB_ACTIVITYMON_SAMPLE_INTERVAL", self.DEFAULT_ACTIVITY_UPDATE_INTERVAL, 60, 86400)
         self.target_hours = self._get_env_int(
             "JUPYTERHUB_ACTIVITYMON_TARGET_HOURS", self.DEFAULT_TARGET_HOURS, 1, 24)
+        self.prune_interval = self._get_env_int(
+            "JUPYTERHUB_ACTIVITYMON_PRUNE_INTERVAL", self.DEFAULT_PRUNE_INTERVAL, 60, 86400)
+        # monotonic time of the last retention prune; None = prune on the next batch
+        self._last_prune = None
 
         self.decay_lambda = math.log(2) / self.half_life_hours
 
@@ -58,12 +69,15 @@ class ActivityMonitor:
 
     @classmethod
     def get_instance(cls):
-        """Get singleton instance."""
-        if cls._instance is None:
+        """Get singleton instance. Once created this is one attribute read - the lock
+        is only taken while the first instance is being built."""
+        instance = cls._instance
+        if instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = cls()
-        return cls._instance
+                instance = cls._instance
+        return instance
 
     def _get_env_int(self, name, default, min_val, max_val):
         """Get integer from environment with validation."""
@@ -78,53 +92,111 @@ class ActivityMonitor:
             return default
 
     def _get_db(self):
-        """Get or create database session (separate DB to avoid SQLite locking)."""
-        if self._db_session is not None:
-            return self._db_session
+        """Get a new session from the pooled factory (separate DB to avoid SQLite locking).
+
+        Each call hands out its own session - the hub's request threads and the
+        sampler never share one - and callers close it to return the connection
+        to the engine's pool.
+        """
+        if self._session_factory is not None:
+            return self._session_factory()
 
         db_url = 'sqlite:////data/activity_samples.sqlite'
         try:
-            self._engine = create_engine(db_url)
-            ActivityBase.metadata.create_all(self._engine)
-            Session = sessionmaker(bind=self._engine)
-            self._db_session = Session()
+            self._engine = create_activity_engine(
+                db_url, pool_size=2, max_overflow=8, pool_pre_ping=True, pool_recycle=1800)
+            # append-only writes and short-lived sessions: nothing needs autoflush or
+            # the post-commit expire/reload of the rows just written
+            self._session_factory = sessionmaker(bind=self._engine, autoflush=False, expire_on_commit=False)
             self._initialized = True
             log.info(f"[ActivityMonitor] Database initialized: {db_url}")
-            return self._db_session
+            return self._session_factory()
         except Exception as e:
             log.info(f"[ActivityMonitor] Database init failed: {e}")
             return None
 
+    def _is_active(self, last_activity, now):
+        """Whether a last_activity epoch (seconds) falls inside the inactive-after window
+        ending at ``now`` (epoch seconds)."""
+        if last_activity is None:
+            return False
+        return now - last_activity <= self.inactive_after_minutes * 60
+
+    def _retention_cutoff(self, now):
+        """Epoch seconds before which samples fall out of the retention window."""
+        return now - self.retention_days * 86400
+
     def record_sample(self, username, last_activity):
-        """Record an activity sample. Always inserts - caller controls frequency."""
+        """Record an activity sample. Always inserts - caller controls frequency.
+        Retention pruning is left to the batch path (see _prune_if_due)."""
         db = self._get_db()
         if db is None:
             return False
 
         try:
-            now = datetime.now(timezone.utc)
-            active = False
-            if last_activity:
-                last_activity_utc = last_activity.replace(tzinfo=timezone.utc) if last_activity.tzinfo is None else last_activity
-                age_seconds = (now - last_activity_utc).total_seconds()
-                active = age_seconds <= (self.inactive_after_minutes * 60)
+            now = int(time.time())
+            last_activity = epoch_seconds(last_activity)
+            active = self._is_active(last_activity, now)
 
             db.add(ActivitySample(username=username, timestamp=now, last_activity=last_activity, active=active))
             db.commit()
-
-            cutoff = now - timedelta(days=self.retention_days)
-            deleted = db.query(ActivitySample).filter(
-                ActivitySample.username == username,
-                ActivitySample.timestamp < cutoff,
-            ).delete()
-            if deleted > 0:
-                db.commit()
-
+            self._fraction_cache.clear()
             return True
         except Exception as e:
             log.info(f"[ActivityMonitor] Error recording sample for {username}: {e}")
             db.rollback()
             return False
+        finally:
+            db.close()
+
+    def record_samples_bulk(self, samples):
+        """Record one sample per (username, last_activity) pair in a single transaction.
+
+        The sampling tick's batch path: every row shares one timestamp, the rows go in
+        as one Core executemany INSERT (no ORM objects), and - at most once per
+        ``prune_interval`` - a single retention prune covers all users, all in one
+        commit. Returns the number of rows written.
+        """
+        db = self._get_db()
+        if db is None:
+            return 0
+
+        try:
+            now = int(time.time())
+            rows = []
+            for username, last_activity in samples:
+                last_activity = epoch_seconds(last_activity)
+                rows.append({
+                    'username': username,
+                    'timestamp': now,
+                    'last_activity': last_activity,
+                    'active': self._is_active(last_activity, now),
+                })
+            if rows:
+                db.execute(ActivitySample.__table__.insert(), rows)
+            self._prune_if_due(db, now)
+            db.commit()
+            self._fraction_cache.clear()
+            return len(rows)
+        except Exception as e:
+            log.info(f"[ActivityMonitor] Error recording {len(samples)} samples: {e}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    def _prune_if_due(self, db, now):
+        """Delete samples past retention when ``prune_interval`` has elapsed since the
+        last prune; the caller commits. Scoring filters on the window anyway, so rows
+        that linger past the cutoff until the next prune never count."""
+        tick = time.monotonic()
+        if self._last_prune is not None and tick - self._last_prune < self.prune_interval:
+            return 0
+        deleted = db.query(ActivitySample).filter(
+            ActivitySample.timestamp < self._retention_cutoff(now),
+        ).delete(synchronize_session=False)
+        self._last_prune = tick
+        return deleted
 
     def get_score(self, username):
         """Calculate activity score (0-100). Returns (score, sample_count).
@@ -142,9 +214,25 @@ class ActivityMonitor:
         active_frac, count = self._weighted_active_fraction(username)
         if active_frac is None:
             return None, 0
+        return self._score_from_fraction(active_frac), count
+
+    def get_scores_bulk(self):
+        """Scores for every user with samples in the retention window, from one query.
+
+        Returns {username: (score, sample_count)} and warms the per-user fraction
+        cache, so get_score / get_avg_active_hours calls for the same users until the
+        next write are served without touching the database.
+        """
+        fractions = self._weighted_active_fractions_bulk()
+        return {
+            username: (self._score_from_fraction(frac), count)
+            for username, (frac, count) in fractions.items()
+        }
+
+    def _score_from_fraction(self, active_frac):
+        """Active fraction -> 0-100 score against the daily target (see get_score)."""
         hours_per_day = active_frac * 24.0
-        score = int(round(min(1.0, hours_per_day / self.target_hours) * 100)) if self.target_hours > 0 else 0
-        return score, count
+        return int(round(min(1.0, hours_per_day / self.target_hours) * 100)) if self.target_hours > 0 else 0
 
     def get_avg_active_hours(self, username):
         """Average active hours/day over the retention window (decay-weighted).
@@ -188,36 +276,76 @@ class ActivityMonitor:
         time; guards sampler jitter / duplicate samples). Shared by get_score
         (normalised vs target) and get_avg_active_hours.
         """
+        cached = self._fraction_cache.get(username)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
         db = self._get_db()
         if db is None:
             return None, 0
 
         try:
-            now = datetime.now(timezone.utc)
-            cutoff = now - timedelta(days=self.retention_days)
-
-            samples = db.query(ActivitySample).filter(
+            weighted_active, count = self._weighted_sums_query(db).filter(
                 ActivitySample.username == username,
-                ActivitySample.timestamp >= cutoff,
-            ).all()
+            ).one()
 
-            if not samples:
+            if not count:
                 return None, 0
 
-            weighted_active = 0.0
-            for s in samples:
-                if s.active:
-                    ts = s.timestamp.replace(tzinfo=timezone.utc) if s.timestamp.tzinfo is None else s.timestamp
-                    age_hours = (now - ts).total_seconds() / 3600.0
-                    weighted_active += math.exp(-self.decay_lambda * age_hours)
-
-            expected_total = self._weighted_expected_total()
-            if expected_total <= 0:
-                return 0.0, len(samples)
-            return min(1.0, weighted_active / expected_total), len(samples)
+            result = self._fraction(weighted_active or 0.0, count)
+            self._fraction_cache[username] = (time.monotonic() + self.SCORE_CACHE_TTL, result)
+            return result
         except Exception as e:
             log.info(f"[ActivityMonitor] Error calculating score for {username}: {e}")
             return None, 0
+        finally:
+            db.close()
+
+    def _weighted_active_fractions_bulk(self):
+        """_weighted_active_fraction for every user at once - one GROUP BY round-trip
+        returning a row per user. Refreshes the fraction cache."""
+        db = self._get_db()
+        if db is None:
+            return {}
+
+        try:
+            rows = self._weighted_sums_query(db, ActivitySample.username).group_by(
+                ActivitySample.username,
+            ).all()
+
+            fractions = {
+                username: self._fraction(weighted_active or 0.0, count)
+                for username, weighted_active, count in rows
+            }
+            expires_at = time.monotonic() + self.SCORE_CACHE_TTL
+            self._fraction_cache.update((username, (expires_at, result)) for username, result in fractions.items())
+            return fractions
+        except Exception as e:
+            log.info(f"[ActivityMonitor] Error calculating scores: {e}")
+            return {}
+        finally:
+            db.close()
+
+    def _weighted_sums_query(self, db, *group_columns):
+        """Query of (*group_columns, decay-weighted active sum, sample count) over the
+        retention window. The exp() weighting runs inside SQLite (``dexp`` is registered
+        on connect), so no sample rows are shipped to Python - callers add a username
+        filter or a GROUP BY and get one row per user back."""
+        now = int(time.time())
+        age_hours = (literal(now) - ActivitySample.timestamp) / 3600.0
+        weight = func.dexp(-self.decay_lambda * age_hours)
+        return db.query(
+            *group_columns,
+            func.sum(case((ActivitySample.active, weight), else_=0.0)).label('weighted_active'),
+            func.count(ActivitySample.id).label('sample_count'),
+        ).filter(ActivitySample.timestamp >= self._retention_cutoff(now))
+
+    def _fraction(self, weighted_active, count):
+        """(fraction, sample_count) from a decay-weighted active sum, capped at 1.0."""
+        expected_total = self._weighted_expected_total()
+        if expected_total <= 0:
+            return 0.0, count
+        return min(1.0, weighted_active / expected_total), count
 
     def get_status(self):
         """Get overall sampling status."""
@@ -235,6 +363,8 @@ class ActivityMonitor:
         except Exception as e:
             log.info(f"[ActivityMonitor] Error getting status: {e}")
             return "Status unavailable"
+        finally:
+            db.close()
 
     def rename_user(self, old_username, new_username):
         """Rename user in activity records."""
@@ -247,6 +377,7 @@ class ActivityMonitor:
                 ActivitySample.username == old_username
             ).update({'username': new_username})
             db.commit()
+            self._fraction_cache.clear()
             if count > 0:
                 log.info(f"[ActivityMonitor] Renamed {count} samples: {old_username} -> {new_username}")
             return True
@@ -254,6 +385,8 @@ class ActivityMonitor:
             log.info(f"[ActivityMonitor] Error renaming user: {e}")
             db.rollback()
             return False
+        finally:
+            db.close()
 
     def delete_user(self, username):
         """Delete all activity records for a user."""
@@ -266,6 +399,7 @@ class ActivityMonitor:
                 ActivitySample.username == username
             ).delete()
             db.commit()
+            self._fraction_cache.clear()
             if count > 0:
                 log.info(f"[ActivityMonitor] Deleted {count} samples for {username}")
             return True
@@ -273,6 +407,8 @@ class ActivityMonitor:
             log.info(f"[ActivityMonitor] Error deleting user: {e}")
             db.rollback()
             return False
+        finally:
+            db.close()
 
     def prune_old_samples(self):
         """Remove all samples older than retention period."""
@@ -281,9 +417,11 @@ class ActivityMonitor:
             return 0
 
         try:
-            cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+            cutoff = self._retention_cutoff(int(time.time()))
             count = db.query(ActivitySample).filter(ActivitySample.timestamp < cutoff).delete()
             db.commit()
+            self._last_prune = time.monotonic()
+            self._fraction_cache.clear()
             if count > 0:
                 log.info(f"[ActivityMonitor] Pruned {count} old samples")
             return count
@@ -291,6 +429,8 @@ class ActivityMonitor:
             log.info(f"[ActivityMonitor] Error pruning samples: {e}")
             db.rollback()
             return 0
+        finally:
+            db.close()
 
     def reset_all(self):
         """Delete all activity samples (reset counters)."""
@@ -301,37 +441,64 @@ class ActivityMonitor:
         try:
             count = db.query(ActivitySample).delete()
             db.commit()
+            self._fraction_cache.clear()
             log.info(f"[ActivityMonitor] Reset: deleted {count} samples")
             return count
         except Exception as e:
             log.info(f"[ActivityMonitor] Error resetting samples: {e}")
             db.rollback()
             return 0
+        finally:
+            db.close()
 
-    def log_activity_tick(self, samples_collected, users_active, users_inactive, users_offline):
-        """Log activity tick with activity level breakdown."""
+    def _activity_levels(self, db, usernames=None):
+        """Count users per activity level ('very-high' >= 80 ... 'very-low' > 0, 'none').
+
+        The score ladder runs in SQL as a CASE over the per-user weighted sums, so the
+        database returns one (level, count) row per bucket. Users whose samples have
+        all aged out of the window have no score and count as 'none'. ``usernames``
+        (the users the caller just sampled) supplies that user total; without it the
+        distinct usernames are counted from the table.
+        """
+        levels = {'very-high': 0, 'high': 0, 'normal': 0, 'low': 0, 'very-low': 0, 'none': 0}
+
+        sums = self._weighted_sums_query(db, ActivitySample.username).group_by(
+            ActivitySample.username,
+        ).subquery()
+        expected_total = self._weighted_expected_total()
+        if expected_total > 0:
+            active_frac = func.min(1.0, sums.c.weighted_active / expected_total)
+        else:
+            active_frac = literal(0.0)
+        score = func.round(func.min(1.0, active_frac * 24.0 / self.target_hours) * 100)
+        level = case(
+            (score >= 80, 'very-high'),
+            (score >= 60, 'high'),
+            (score >= 40, 'normal'),
+            (score >= 20, 'low'),
+            (score > 0, 'very-low'),
+            else_='none',
+        ).label('level')
+
+        for name, count in db.query(level, func.count()).select_from(sums).group_by(level).all():
+            levels[name] += count
+
+        if usernames is not None:
+            total_users = len(set(usernames))
+        else:
+            total_users = db.query(func.count(func.distinct(ActivitySample.username))).scalar() or 0
+        levels['none'] += max(0, total_users - sum(levels.values()))
+        return levels
+
+    def log_activity_tick(self, samples_collected, users_active, users_inactive, users_offline, usernames=None):
+        """Log activity tick with activity level breakdown. Pass the tick's sampled
+        ``usernames`` to skip re-counting the distinct users in the table."""
         db = self._get_db()
         if db is None:
             return
 
         try:
-            usernames = [r[0] for r in db.query(func.distinct(ActivitySample.username)).all()]
-
-            levels = {'very-high': 0, 'high': 0, 'normal': 0, 'low': 0, 'very-low': 0, 'none': 0}
-            for username in usernames:
-                score, _ = self.get_score(username)
-                if score is None or score == 0:
-                    levels['none'] += 1
-                elif score >= 80:
-                    levels['very-high'] += 1
-                elif score >= 60:
-                    levels['high'] += 1
-                elif score >= 40:
-                    levels['normal'] += 1
-                elif score >= 20:
-                    levels['low'] += 1
-                else:
-                    levels['very-low'] += 1
+            levels = self._activity_levels(db, usernames)
 
             total_users = users_active + users_inactive + users_offline
             level_str = ', '.join([f"{k}({v})" for k, v in levels.items() if v > 0]) or 'none'
@@ -343,3 +510,5 @@ class ActivityMonitor:
             )
         except Exception as e:
             log.info(f"[ActivityMonitor] Error logging tick: {e}")
+        finally:
+            db.close()
@@ -8,14 +8,14 @@ SQLite database for activity scoring.
 import asyncio
 import os
 import sys
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 
 import aiohttp
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from ..logging_setup import log
-from .model import ActivityBase, ActivitySample
+from .model import ActivitySample, create_activity_engine, epoch_seconds
 
 
 class ActivitySamplerService:
@@ -29,10 +29,13 @@ class ActivitySamplerService:
         self.retention_days = int(os.environ.get('JUPYTERHUB_ACTIVITYMON_RETENTION_DAYS', 7))
         self.half_life_hours = int(os.environ.get('JUPYTERHUB_ACTIVITYMON_HALF_LIFE', 72))
         self.inactive_after_minutes = int(os.environ.get('JUPYTERHUB_ACTIVITYMON_INACTIVE_AFTER', 60))
+        self.prune_interval = int(os.environ.get('JUPYTERHUB_ACTIVITYMON_PRUNE_INTERVAL', 3600))
+        self._last_prune = None  # monotonic; None = prune with the first batch
 
         self.db_url = 'sqlite:////data/activity_samples.sqlite'
         self._engine = None
         self._session = None
+        self._http = None  # hub API session, opened by run() and reused across ticks
 
         log.info(
             f"Config: interval={self.sample_interval}s, retention={self.retention_days}d, "
@@ -44,9 +47,8 @@ class ActivitySamplerService:
             return self._session
 
         try:
-            self._engine = create_engine(self.db_url)
-            ActivityBase.metadata.create_all(self._engine)
-            Session = sessionmaker(bind=self._engine)
+            self._engine = create_activity_engine(self.db_url)
+            Session = sessionmaker(bind=self._engine, autoflush=False, expire_on_commit=False)
             self._session = Session()
             log.info(f"Database initialized: {self.db_url}")
             return self._session
@@ -59,61 +61,79 @@ class ActivitySamplerService:
             log.error("No API token available")
             return []
 
-        headers = {'Authorization': f'token {self.api_token}'}
         url = f"{self.api_url}/users"
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status != 200:
-                        log.error(f"API request failed: {resp.status}")
-                        return []
-                    return await resp.json()
+            if self._http is None or self._http.closed:
+                self._http = self._open_http()
+            async with self._http.get(url) as resp:
+                if resp.status != 200:
+                    log.error(f"API request failed: {resp.status}")
+                    return []
+                return await resp.json()
         except Exception as e:
             log.error(f"Error fetching users: {e}")
             return []
 
+    def _open_http(self):
+        """Hub API session with the service token; its keep-alive pool is reused by
+        every tick instead of reconnecting each time."""
+        return aiohttp.ClientSession(
+            headers={'Authorization': f'token {self.api_token}'},
+            connector=aiohttp.TCPConnector(limit=4),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+
+    @staticmethod
+    def _parse_last_activity(last_activity_str):
+        if not last_activity_str:
+            return None
+        try:
+            return datetime.fromisoformat(last_activity_str.replace('Z', '+00:00'))
+        except (ValueError, AttributeError):
+            return None
+
     def record_sample(self, username, last_activity_str):
+        return self.record_samples([(username, last_activity_str)]) == 1
+
+    def record_samples(self, samples):
+        """Record (username, last_activity_str) pairs as one bulk insert (+ the periodic
+        retention prune when due), one commit."""
         db = self._init_db()
         if db is None:
-            return False
+            return 0
 
         try:
-            now = datetime.now(timezone.utc)
-
-            last_activity = None
-            if last_activity_str:
-                try:
-                    last_activity = datetime.fromisoformat(last_activity_str.replace('Z', '+00:00'))
-                except (ValueError, AttributeError):
-                    pass
-
-            active = False
-            if last_activity:
-                age_seconds = (now - last_activity).total_seconds()
-                active = age_seconds <= (self.inactive_after_minutes * 60)
-
-            db.add(ActivitySample(
-                username=username,
-                timestamp=now,
-                last_activity=last_activity,
-                active=active,
-            ))
+            now = int(time.time())
+            inactive_threshold = self.inactive_after_minutes * 60
+
+            rows = []
+            for username, last_activity_str in samples:
+                last_activity = epoch_seconds(self._parse_last_activity(last_activity_str))
+                active = last_activity is not None and now - last_activity <= inactive_threshold
+                rows.append({
+                    'username': username,
+                    'timestamp': now,
+                    'last_activity': last_activity,
+                    'active': active,
+                })
+            if rows:
+                db.execute(ActivitySample.__table__.insert(), rows)
+
+            # retention prune at most once per prune_interval, not on every tick
+            tick = time.monotonic()
+            if self._last_prune is None or tick - self._last_prune >= self.prune_interval:
+                cutoff = now - self.retention_days * 86400
+                db.query(ActivitySample).filter(
+                    ActivitySample.timestamp < cutoff,
+                ).delete(synchronize_session=False)
+                self._last_prune = tick
             db.commit()
-
-            cutoff = now - timedelta(days=self.retention_days)
-            deleted = db.query(ActivitySample).filter(
-                ActivitySample.username == username,
-                ActivitySample.timestamp < cutoff,
-            ).delete()
-            if deleted > 0:
-                db.commit()
-
-            return True
+            return len(rows)
         except Exception as e:
-            log.error(f"Error recording sample for {username}: {e}")
+            log.error(f"Error recording {len(samples)} samples: {e}")
             db.rollback()
-            return False
+            return 0
 
     async def sample_all_users(self):
         users = await self.fetch_users()
@@ -122,6 +142,7 @@ class ActivitySamplerService:
             return
 
         counts = {'total': 0, 'active': 0, 'inactive': 0, 'offline': 0}
+        samples = []
         now = datetime.now(timezone.utc)
         inactive_threshold = self.inactive_after_minutes * 60
 
@@ -135,7 +156,7 @@ class ActivitySamplerService:
             server_active = default_server.get('ready', False)
             last_activity_str = default_server.get('last_activity') or user.get('last_activity')
 
-            self.record_sample(username, last_activity_str)
+            samples.append((username, last_activity_str))
             counts['total'] += 1
 
             if server_active:
@@ -154,6 +175,9 @@ class ActivitySamplerService:
             else:
                 counts['offline'] += 1
 
+        # blocking SQLite write off the loop, so a slow commit can't delay the next fetch
+        await asyncio.to_thread(self.record_samples, samples)
+
         log.info(
             f"Sampled {counts['total']} users: {counts['active']} active, "
             f"{counts['inactive']} inactive, {counts['offline']} offline"
@@ -163,12 +187,16 @@ class ActivitySamplerService:
         log.info(f"Starting activity sampler (interval: {self.sample_interval}s)")
         await asyncio.sleep(5)  # Let JupyterHub fully start
 
-        while True:
-            try:
-                await self.sample_all_users()
-            except Exception as e:
-                log.error(f"Error in sampling loop: {e}")
-            await asyncio.sleep(self.sample_interval)
+        self._http = self._open_http()
+        try:
+            while True:
+                try:
+                    await self.sample_all_users()
+                except Exception as e:
+                    log.error(f"Error in sampling loop: {e}")
+                await asyncio.sleep(self.sample_interval)
+        finally:
+            await self._http.close()
 
 
 def main():
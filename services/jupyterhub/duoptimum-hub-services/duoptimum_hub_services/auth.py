@@ -125,7 +125,8 @@ class CustomAuthorizationAreaHandler(BaseAuthorizationHandler):
         from nativeauthenticator.orm import UserInfo
         from jupyterhub import orm
 
-        hub_usernames = {u.name for u in self.db.query(orm.User).all()}
+        # names only - the template just tests membership, no User rows to hydrate
+        hub_usernames = {name for (name,) in self.db.query(orm.User.name).all()}
 
         html = await self.render_template(
             "authorization-area.html",
@@ -148,20 +149,19 @@ class _AntdAuthHandlersMixin:
     """Swap NativeAuth's login/signup/authorization handlers for the antd-rendering
     Duoptimum variants so the portal owns the auth screens."""
 
+    # NativeAuth handler class name -> the Duoptimum replacement, built once at import
+    _HANDLER_OVERRIDES = {
+        'AuthorizationAreaHandler': CustomAuthorizationAreaHandler,
+        'LoginHandler': DuoptimumLoginHandler,
+        'SignUpHandler': BootstrapAdminSignUpHandler,
+    }
+
     def get_handlers(self, app):
-        handlers = super().get_handlers(app)
-        new_handlers = []
-        for pattern, handler in handlers:
-            name = handler.__name__
-            if name == 'AuthorizationAreaHandler':
-                new_handlers.append((pattern, CustomAuthorizationAreaHandler))
-            elif name == 'LoginHandler':
-                new_handlers.append((pattern, DuoptimumLoginHandler))
-            elif name == 'SignUpHandler':
-                new_handlers.append((pattern, BootstrapAdminSignUpHandler))
-            else:
-                new_handlers.append((pattern, handler))
-        return new_handlers
+        overrides = self._HANDLER_OVERRIDES
+        return [
+            (pattern, overrides.get(handler.__name__, handler))
+            for pattern, handler in super().get_handlers(app)
+        ]
 
 
 class _AdminPromotionMixin:
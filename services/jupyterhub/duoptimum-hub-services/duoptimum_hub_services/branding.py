@@ -5,6 +5,21 @@ import shutil
 import sys
 
 
+def _copy_if_changed(src, dst):
+    """Copy ``src`` to ``dst`` unless ``dst`` already matches it by size and mtime.
+
+    copy2 carries the mtime over, so on a restart with unchanged branding files
+    every asset is skipped instead of rewritten into the static dir.
+    """
+    try:
+        src_stat, dst_stat = os.stat(src), os.stat(dst)
+        if src_stat.st_size == dst_stat.st_size and src_stat.st_mtime == dst_stat.st_mtime:
+            return
+    except FileNotFoundError:
+        pass
+    shutil.copy2(src, dst)
+
+
 def setup_branding(logo_uri='', favicon_uri='', favicon_busy_uri='',
                    lab_main_icon_uri='', lab_splash_icon_uri='', stage=''):
     """Process branding URIs. Returns branding state dict.
@@ -56,7 +71,7 @@ def setup_branding(logo_uri='', favicon_uri='', favicon_busy_uri='',
         favicon_file = favicon_uri[7:]
         if os.path.exists(favicon_file):
             static_favicon = os.path.join(static_dir, 'favicon.ico')
-            shutil.copy2(favicon_file, static_favicon)
+            _copy_if_changed(favicon_file, static_favicon)
         favicon_uri = ''  # Served via static_url after copy
     branding['favicon_uri'] = favicon_uri
 
@@ -67,7 +82,7 @@ def setup_branding(logo_uri='', favicon_uri='', favicon_busy_uri='',
     if favicon_busy_uri.startswith('file://'):
         busy_file = favicon_busy_uri[7:]
         if os.path.exists(busy_file):
-            shutil.copy2(busy_file, os.path.join(static_dir, 'favicon-busy.ico'))
+            _copy_if_changed(busy_file, os.path.join(static_dir, 'favicon-busy.ico'))
             branding['favicon_busy_target'] = 'hub/static/favicon-busy.ico'
     elif favicon_busy_uri:
         branding['favicon_busy_target'] = favicon_busy_uri
@@ -78,7 +93,7 @@ def setup_branding(logo_uri='', favicon_uri='', favicon_busy_uri='',
         if os.path.exists(icon_file):
             ext = os.path.splitext(icon_file)[1] or '.svg'
             static_name = f'lab-main-icon{ext}'
-            shutil.copy2(icon_file, os.path.join(static_dir, static_name))
+            _copy_if_changed(icon_file, os.path.join(static_dir, static_name))
             branding['lab_main_icon_static'] = static_name
     elif lab_main_icon_uri:
         branding['lab_main_icon_url'] = lab_main_icon_uri
@@ -89,7 +104,7 @@ def setup_branding(logo_uri='', favicon_uri='', favicon_busy_uri='',
         if os.path.exists(icon_file):
             ext = os.path.splitext(icon_file)[1] or '.svg'
             static_name = f'lab-splash-icon{ext}'
-            shutil.copy2(icon_file, os.path.join(static_dir, static_name))
+            _copy_if_changed(icon_file, os.path.join(static_dir, static_name))
             branding['lab_splash_icon_static'] = static_name
     elif lab_splash_icon_uri:
         branding['lab_splash_icon_url'] = lab_splash_icon_uri
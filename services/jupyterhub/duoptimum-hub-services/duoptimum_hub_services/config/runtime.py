@@ -2,7 +2,7 @@
 
 `assemble_runtime(settings, compose_project)` runs the GPU-detection -> sidecar
 lifecycle -> gpu-cache -> branding orchestration - the same calls, in the same order,
-with the same side effects (starts the gpuinfo sidecar, registers the atexit cleanup,
+with the same side effects (starts the gpuinfo sidecar, registers the atexit cleanups,
 copies branding assets) - and returns a frozen `Runtime` bundling the produced values.
 
 This is a VERBATIM move of jupyterhub_config.py's Section-3 GPU/branding block: the
@@ -26,7 +26,7 @@ from .. import (
     setup_branding,
     stop_gpuinfo_sidecar,
 )
-from ..docker_utils import resolve_gpuinfo_network
+from ..docker_utils import close_shared_docker_clients, resolve_gpuinfo_network
 from ..logging_setup import log
 
 
@@ -72,6 +72,9 @@ def assemble_runtime(settings, compose_project):
     gpuinfo_sidecar_up = bool(gpuinfo_url)
     # Point the detection client + utilisation sampler at the runtime-resolved URL.
     configure_gpu_cache(gpuinfo_url)
+    # Release the process-wide Docker clients the handlers/caches share on hub exit.
+    # Registered before the sidecar teardown so (atexit is LIFO) it runs after it.
+    atexit.register(close_shared_docker_clients)
     # Tie the sidecar's lifecycle to the hub: remove it when the hub exits so it does not
     # linger as an orphan. Best-effort - skipped on a hard SIGKILL.
     if gpuinfo_sidecar_up:
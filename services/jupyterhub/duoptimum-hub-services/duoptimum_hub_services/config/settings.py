@@ -48,6 +48,9 @@ class Settings:
     activitymon_target_hours: int
     activitymon_sample_interval: int
 
+    # ── Notification broadcast ──
+    broadcast_concurrency: int            # max concurrent deliveries per broadcast
+
     # ── Docker + resource thresholds ──
     hub_docker_api_timeout: int
     lab_container_max_extra_space_gb: int
@@ -140,6 +143,8 @@ def load_settings():
         activitymon_target_hours=int(e("JUPYTERHUB_ACTIVITYMON_TARGET_HOURS", 8)),
         activitymon_sample_interval=int(e("JUPYTERHUB_ACTIVITYMON_SAMPLE_INTERVAL", 600)),
 
+        broadcast_concurrency=int(e("JUPYTERHUB_BROADCAST_CONCURRENCY", 32)),
+
         hub_docker_api_timeout=int(e("JUPYTERHUB_HUB_DOCKER_API_TIMEOUT", 360)),
         lab_container_max_extra_space_gb=int(e("JUPYTERHUB_LAB_CONTAINER_MAX_EXTRA_SPACE_GB", 10)),
         lab_volume_max_total_size_gb=int(e("JUPYTERHUB_LAB_VOLUME_MAX_TOTAL_SIZE_GB", 50)),
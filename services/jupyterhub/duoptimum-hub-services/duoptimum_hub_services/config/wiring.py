@@ -81,6 +81,7 @@ def stellars_config(settings, runtime, *, user_volume_suffixes, user_volume_name
         'idle_culler_enabled': settings.idle_culler_enabled,  # SessionInfoHandler, ActivityDataHandler
         'idle_culler_timeout': settings.idle_culler_timeout,  # SessionInfoHandler, ExtendSessionHandler
         'idle_culler_max_extension': settings.idle_culler_max_extension,  # ExtendSessionHandler limits
+        'broadcast_concurrency': settings.broadcast_concurrency,  # BroadcastNotificationHandler fan-out cap
         'gpu_list': runtime.gpu_list,                        # host GPUs (GroupsDataHandler, ActivityDataHandler)
         'gpu_available': bool(runtime.gpu_enabled),          # hardware-present gate for resolve_policies
         'gpu_isolation_enforced': runtime.gpu_isolation_enforced,  # False on WSL2 -> portal advisory note
@@ -149,20 +149,20 @@ class ContainerSizeRefresher:
         log.info(f"[ContainerSizeRefresher] Initialized with interval={self.interval_seconds}s")
 
     def start(self):
-        from tornado.ioloop import PeriodicCallback
+        from tornado.ioloop import IOLoop, PeriodicCallback
+        from .docker_utils import REFRESH_JITTER, first_refresh_delay
 
         if self.periodic_callback is not None:
             log.info("[ContainerSizeRefresher] Already running")
             return
 
         interval_ms = self.interval_seconds * 1000
-        self.periodic_callback = PeriodicCallback(self._refresh_tick, interval_ms)
+        self.periodic_callback = PeriodicCallback(self._refresh_tick, interval_ms, jitter=REFRESH_JITTER)
         self.periodic_callback.start()
         log.info(f"[ContainerSizeRefresher] Started - refreshing every {self.interval_seconds}s")
 
-        # First refresh immediately
-        from .docker_utils import get_executor
-        get_executor().submit(_refresh_all_container_sizes)
+        # First refresh shortly, staggered against the other refreshers
+        IOLoop.current().call_later(first_refresh_delay(self.interval_seconds), self._refresh_tick)
 
     def stop(self):
         if self.periodic_callback is not None:
@@ -11,6 +11,10 @@ endpoint for 5-6s. This keeps a warm snapshot of per-user stats and refreshes it
   `last_activity`-based signal) - idle-but-running containers keep their last
   value and are never polled, and
 - when no user is active there are **zero docker calls**.
+- after a user's first reading, refreshes ask docker for a one-shot snapshot and
+  take the CPU delta against that previous reading, skipping the second sample.
+- a container's inspect attrs are kept per container id, so a repeat refresh makes
+  one stats call per lab instead of inspect + stats.
 
 `/activity` reads the snapshot non-blocking (returns instantly, no docker gather).
 Cache is keyed by the escapism-encoded username (the `jupyterlab-<encoded>`
@@ -18,6 +22,8 @@ container-name suffix), matching how the handler looks it up.
 """
 
 import os
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 
@@ -30,6 +36,16 @@ _container_stats_cache = {'data': {}, 'timestamp': None, 'refreshing': False}
 # Dedicated executor for stats fetches (separate from the size/ops executors)
 _stats_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="docker-stats")
 
+# Held for the whole refresh. The non-blocking acquire is the atomic check-and-set the
+# bare 'refreshing' flag could not be: two submits racing on the shared executor never
+# run two refreshes. The flag stays as the cheap lock-free hint the trigger reads.
+_refresh_lock = threading.Lock()
+
+# Inspect attrs (HostConfig limits, Image) by container id. Both are fixed for a
+# container's lifetime - a respawn gets a new id - so they are fetched once and the
+# stats model is rebuilt from them; ids no longer running are pruned each refresh.
+_container_attrs = {}
+
 
 def _get_docker_timeout():
     return int(os.environ.get('JUPYTERHUB_HUB_DOCKER_API_TIMEOUT', 360))
@@ -42,20 +58,40 @@ def _get_refresh_interval():
     return int(os.environ.get('JUPYTERHUB_ACTIVITYMON_STATS_INTERVAL', 10))
 
 
-def _fetch_single_container_stats(container_name, timeout):
-    """Fetch stats for one container (blocking). Returns (encoded_username, data) or None."""
+def _previous_cpu_sample(encoded_username):
+    """CPU counters of the user's last reading when recent enough to delta against,
+    else None (the next read then samples twice). A baseline older than a few
+    refresh intervals would average CPU over the whole idle gap."""
+    previous = _container_stats_cache['data'].get(encoded_username)
+    if not previous or 'cpu_sample' not in previous:
+        return None
+    if time.monotonic() - previous.get('sampled_at', 0) > 3 * _get_refresh_interval():
+        return None
+    return previous['cpu_sample']
+
+
+def _fetch_single_container_stats(container_name, timeout, container_id=None):
+    """Fetch stats for one container (blocking). Returns (encoded_username, data) or None.
+
+    With ``container_id`` (from the refresh's listing) the inspect is skipped when
+    that container's attrs were already fetched.
+    """
     try:
-        from .docker_utils import get_docker_client
-        client = get_docker_client(timeout=timeout)
-        try:
-            container = client.containers.get(container_name)
-            data = stats_from_container(container)
-            if data is None:
-                return None
-            encoded_username = encoded_username_from_lab_container(container_name)
-            return encoded_username, data
-        finally:
-            client.close()
+        from .docker_utils import get_shared_docker_client
+        encoded_username = encoded_username_from_lab_container(container_name)
+        containers = get_shared_docker_client(timeout=timeout).containers
+        attrs = _container_attrs.get(container_id) if container_id else None
+        if attrs is not None:
+            container = containers.prepare_model(attrs)
+        else:
+            container = containers.get(container_id or container_name)
+            if container_id:
+                _container_attrs[container_id] = container.attrs
+        data = stats_from_container(container, _previous_cpu_sample(encoded_username))
+        if data is None:
+            return None
+        data['sampled_at'] = time.monotonic()
+        return encoded_username, data
     except Exception:
         return None
 
@@ -67,33 +103,34 @@ def _refresh_active_container_stats(active_encoded):
     idle-but-running containers are left untouched (their last snapshot stands).
     Stale entries for stopped containers are pruned. Updates the cache incrementally.
     """
-    global _container_stats_cache
-    if _container_stats_cache['refreshing']:
-        return
     active_encoded = set(active_encoded or ())
     if not active_encoded:
         return  # nobody active -> no docker calls at all
+    if not _refresh_lock.acquire(blocking=False):
+        return  # another refresh is in flight
 
     _container_stats_cache['refreshing'] = True
     try:
-        from .docker_utils import get_docker_api_client
+        from .docker_utils import get_shared_docker_api_client
         # List only RUNNING containers (no all=True - excludes stopped)
-        api = get_docker_api_client(timeout=30)
-        try:
-            containers = api._get(api._url('/containers/json')).json()
-        finally:
-            api.close()
+        api = get_shared_docker_api_client(timeout=30)
+        containers = api._get(api._url('/containers/json')).json()
 
         running_users = set()
-        names = []  # names we will actually sample (active AND running)
+        running_ids = set()
+        names = []  # (name, id) we will actually sample (active AND running)
         for ctr in containers:
             for name in ctr.get('Names', []):
                 name = name.lstrip('/')
                 encoded = encoded_username_from_lab_container(name)
                 if encoded is not None:
                     running_users.add(encoded)
+                    running_ids.add(ctr.get('Id'))
                     if encoded in active_encoded:
-                        names.append(name)
+                        names.append((name, ctr.get('Id')))
+
+        for container_id in [c for c in _container_attrs if c not in running_ids]:
+            del _container_attrs[container_id]
 
         # Drop snapshot entries for containers that are no longer running
         stale = [u for u in _container_stats_cache['data'] if u not in running_users]
@@ -107,7 +144,10 @@ def _refresh_active_container_stats(active_encoded):
             return
 
         timeout = _get_docker_timeout()
-        futures = {_stats_executor.submit(_fetch_single_container_stats, n, timeout): n for n in names}
+        futures = {
+            _stats_executor.submit(_fetch_single_container_stats, n, timeout, cid): n
+            for n, cid in names
+        }
 
         completed = 0
         for future in as_completed(futures):
@@ -124,6 +164,7 @@ def _refresh_active_container_stats(active_encoded):
         log.error(f"[Container Stats] Error during refresh: {e}")
     finally:
         _container_stats_cache['refreshing'] = False
+        _refresh_lock.release()
 
 
 def get_cached_container_stats():
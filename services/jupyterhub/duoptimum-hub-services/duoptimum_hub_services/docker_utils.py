@@ -2,12 +2,16 @@
 
 import asyncio
 import os
+import random
 import re
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import lru_cache
 
+from escapism import escape
+
 _docker_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="docker-ops")
 
 # Single source of truth for the local Docker daemon socket + client construction.
@@ -35,13 +39,56 @@ def get_docker_api_client(timeout=None):
     return docker.APIClient(base_url=DOCKER_SOCKET_URL, timeout=timeout)
 
 
+# Long-lived clients for the hot background paths (per-container stats sampling,
+# the volume `df`). Building a client per call paid the socket setup plus docker-py's
+# version probe every time; a client wraps a requests Session whose pooled urllib3
+# transport is safe to share across the executor threads and reconnects on its own
+# after a daemon restart. Keyed by (kind, timeout) so each caller keeps its timeout.
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+
+def _shared_client(kind, factory, timeout):
+    key = (kind, timeout)
+    client = _shared_clients.get(key)
+    if client is None:
+        with _shared_clients_lock:
+            client = _shared_clients.get(key)
+            if client is None:
+                client = _shared_clients[key] = factory(timeout=timeout)
+    return client
+
+
+def get_shared_docker_client(timeout=None):
+    """Process-wide DockerClient for hot paths. Callers must NOT close it."""
+    return _shared_client('client', get_docker_client, timeout)
+
+
+def get_shared_docker_api_client(timeout=None):
+    """Process-wide APIClient for hot paths. Callers must NOT close it."""
+    return _shared_client('api', get_docker_api_client, timeout)
+
+
+def close_shared_docker_clients():
+    """Close and forget every shared client (shutdown, tests). Best-effort."""
+    with _shared_clients_lock:
+        clients = list(_shared_clients.values())
+        _shared_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
+@lru_cache(maxsize=4096)
 def encode_username_for_docker(username):
     """Encode username for Docker volume/container names.
 
     Uses escapism library (same as DockerSpawner) for compatibility.
     e.g., 'user.name' -> 'user-2ename' (. = ASCII 46 = 0x2e)
+    Memoized: the same few usernames are encoded on every stats/volume/proxy path.
     """
-    from escapism import escape
     return escape(username, escape_char='-').lower()
 
 
@@ -136,18 +183,34 @@ def mem_usage_excluding_cache(memory_stats):
     return usage
 
 
-def stats_from_container(container):
+def stats_from_container(container, previous_cpu=None):
     """CPU/memory/image stats dict for an already-resolved Docker container object
     (blocking, ~2s - `stats(stream=False)` samples twice). Single source of truth
     for the stats math, shared by the ad-hoc `get_container_stats` and the
-    background `ContainerStatsRefresher`. Returns the dict, or None on any failure."""
+    background `ContainerStatsRefresher`. Returns the dict, or None on any failure.
+
+    With ``previous_cpu`` (the ``cpu_sample`` of an earlier reading of the same
+    container) the daemon is asked for a one-shot snapshot instead - no second
+    sampling cycle, so no ~1s wait - and the CPU delta is taken against that
+    earlier reading. A daemon without one-shot (API < 1.41) falls back to the
+    two-cycle read."""
     try:
-        stats = container.stats(stream=False)
+        stats = None
+        precpu = None
+        if previous_cpu is not None:
+            try:
+                stats = container.stats(stream=False, one_shot=True)
+                precpu = previous_cpu
+            except Exception:
+                stats = None
+        if stats is None:
+            stats = container.stats(stream=False)
+            precpu = stats['precpu_stats']
 
         cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - \
-                    stats['precpu_stats']['cpu_usage']['total_usage']
+                    precpu['cpu_usage']['total_usage']
         system_delta = stats['cpu_stats']['system_cpu_usage'] - \
-                       stats['precpu_stats']['system_cpu_usage']
+                       precpu['system_cpu_usage']
 
         online_cpus = stats['cpu_stats'].get('online_cpus', 1) or 1
         cpu_percent = 0.0
@@ -182,6 +245,11 @@ def stats_from_container(container):
             # image id the container is running (from the inspect we already
             # did) - compared against the local tag for upgrade detection
             'image_id': container.attrs.get('Image'),
+            # raw counters of this reading, the baseline for the next one-shot read
+            'cpu_sample': {
+                'cpu_usage': {'total_usage': stats['cpu_stats']['cpu_usage']['total_usage']},
+                'system_cpu_usage': stats['cpu_stats']['system_cpu_usage'],
+            },
         }
     except Exception:
         return None
@@ -190,14 +258,8 @@ def stats_from_container(container):
 def get_container_stats(username):
     """Get CPU and memory stats for a user's container (blocking, fast ~2s)."""
     try:
-        docker_client = get_docker_client()
-        container_name = lab_container_name(username)
-
-        try:
-            container = docker_client.containers.get(container_name)
-            return stats_from_container(container)
-        finally:
-            docker_client.close()
+        container = get_shared_docker_client().containers.get(lab_container_name(username))
+        return stats_from_container(container)
     except Exception:
         return None
 
@@ -514,6 +576,19 @@ def get_executor():
     return _docker_executor
 
 
+# The periodic refreshers (volume sizes, container sizes, GPU utilisation) all start
+# together at boot. Their PeriodicCallbacks get this jitter fraction, and each first
+# pass waits a random first_refresh_delay, so their docker/SQLite work spreads out
+# instead of landing in the same instant on every tick.
+REFRESH_JITTER = 0.1
+
+
+def first_refresh_delay(interval_seconds):
+    """Random delay (seconds) before a refresher's first pass - at most a quarter of
+    its interval, capped at 30s so caches still warm promptly after boot."""
+    return random.uniform(0, min(30, interval_seconds / 4))
+
+
 # ── Lab image upgrade detection ──────────────────────────────────────────────
 # Ask: does the lab image tag now resolve to a different image than the one the
 # running container uses? Compare image IDs, not Created times - a rebuilt+pruned
@@ -15,7 +15,7 @@ plain inventory chips.
 import os
 from datetime import datetime, timezone
 
-from .docker_utils import get_executor
+from .docker_utils import REFRESH_JITTER, first_refresh_delay, get_executor
 from .logging_setup import log
 
 # Cache: {'data': {index: {utilization, memory_used_mb, processes}}, 'timestamp': datetime, 'refreshing': bool}
@@ -142,17 +142,17 @@ class GpuUtilizationRefresher:
         log.info(f"[GpuUtilizationRefresher] Initialized with interval={self.interval_seconds}s")
 
     def start(self):
-        from tornado.ioloop import PeriodicCallback
+        from tornado.ioloop import IOLoop, PeriodicCallback
 
         if self.periodic_callback is not None:
             return
 
         interval_ms = self.interval_seconds * 1000
-        self.periodic_callback = PeriodicCallback(self._refresh_tick, interval_ms)
+        self.periodic_callback = PeriodicCallback(self._refresh_tick, interval_ms, jitter=REFRESH_JITTER)
         self.periodic_callback.start()
         log.info(f"[GpuUtilizationRefresher] Started - sampling every {self.interval_seconds}s")
 
-        get_executor().submit(_refresh_sync)
+        IOLoop.current().call_later(first_refresh_delay(self.interval_seconds), self._refresh_tick)
 
     def stop(self):
         if self.periodic_callback is not None:
@@ -1,19 +1,20 @@
 """Handlers for activity monitoring page and API."""
 
+import json
 from datetime import datetime, timezone
 
+from jupyterhub import orm
 from jupyterhub.handlers import BaseHandler
+from sqlalchemy import or_, text
+from sqlalchemy.orm import selectinload
 from tornado import web
 
 from ..activity.helpers import (
-    calculate_activity_score,
-    calculate_avg_active_hours,
     get_activity_sampling_status,
-    get_activity_target_hours,
-    get_inactive_after_seconds,
     record_samples_for_all_users,
     reset_all_activity_data,
 )
+from ..activity.monitor import ActivityMonitor
 
 
 from ..docker_utils import encode_username_for_docker, newer_lab_image_available
@@ -50,39 +51,71 @@ class ActivityDataHandler(BaseHandler):
         volume_sizes = get_volume_sizes_with_refresh()
         container_sizes = get_container_sizes_with_refresh()
 
-        users_data = []
-        active_users = []
-        from jupyterhub import orm
+        # resolve the monitor once for the per-user loop below; every user's score
+        # comes from one GROUP BY, which also warms the fraction cache the hours read
+        monitor = ActivityMonitor.get_instance()
+        inactive_threshold = monitor.inactive_after_minutes * 60
+        scores = monitor.get_scores_bulk()
 
-        for orm_user in self.db.query(orm.User).all():
-            user = self.find_user(orm_user.name)
-            if not user:
-                continue
+        # NativeAuthenticator approval flags for every user in one query, not one per user
+        authorized_by_name = {}
+        try:
+            rows = self.db.execute(text("SELECT username, is_authorized FROM users_info")).fetchall()
+            authorized_by_name = {username: bool(is_authorized) for username, is_authorized in rows}
+        except Exception:
+            pass
 
-            spawner = user.spawner
-            server_active = spawner.active if spawner else False
+        now = datetime.now(timezone.utc)
+        ceiling = calc_ceiling(timeout_seconds, max_extension_hours)
 
-            encoded_name = encode_username_for_docker(user.name)
+        users_data = []
+        active_users = []
+
+        # Only users that can produce a row are loaded: a server row or a recorded
+        # last_activity on the default spawner, activity samples (a separate DB, so
+        # matched by name), or already wrapped by the hub (a pending spawn has no
+        # server row yet). Spawner rows come in with the users (one extra SELECT ...
+        # IN, not one per user). Only users with a live server row - or already
+        # wrapped - are wrapped, so idle accounts never get a Spawner materialised.
+        # The wrapper comes from the hub's user dict keyed by the loaded row, not
+        # find_user, which would re-SELECT the user by name.
+        default_spawner = (orm.Spawner.user_id == orm.User.id) & (orm.Spawner.name == '')
+        orm_users = (
+            self.db.query(orm.User)
+            .outerjoin(orm.Spawner, default_spawner)
+            .filter(or_(
+                orm.Spawner.server_id.isnot(None),
+                orm.Spawner.last_activity.isnot(None),
+                orm.User.id.in_(list(self.users)),
+                orm.User.name.in_(list(scores)),
+            ))
+            .options(selectinload(orm.User._orm_spawners))
+            .all()
+        )
+        for orm_user in orm_users:
+            orm_spawner = next((s for s in orm_user._orm_spawners if s.name == ''), None)
+            if orm_user.id in self.users or (orm_spawner is not None and orm_spawner.server_id is not None):
+                user = self.users[orm_user]
+                spawner = user.spawner
+                server_active = spawner.active if spawner else False
+                if spawner and spawner.orm_spawner:
+                    orm_spawner = spawner.orm_spawner
+            else:
+                spawner = None
+                server_active = False
+
+            username = orm_user.name
+            encoded_name = encode_username_for_docker(username)
             user_volume_data = volume_sizes.get(encoded_name, {"total": 0, "volumes": {}})
             user_volume_size = user_volume_data.get("total", 0)
             user_volume_breakdown = user_volume_data.get("volumes", {})
             user_ctr_size = container_sizes.get(encoded_name, {})
 
             # Get authorization status from NativeAuthenticator
-            is_authorized = False
-            try:
-                from sqlalchemy import text
-                result = self.db.execute(
-                    text("SELECT is_authorized FROM users_info WHERE username = :username"),
-                    {"username": user.name},
-                ).fetchone()
-                if result:
-                    is_authorized = bool(result[0])
-            except Exception:
-                pass
+            is_authorized = authorized_by_name.get(username, False)
 
             user_data = {
-                "username": user.name,
+                "username": username,
                 "is_authorized": is_authorized,
                 "server_active": server_active,
                 "recently_active": False,
@@ -107,22 +140,20 @@ class ActivityDataHandler(BaseHandler):
                 "container_size_rootfs_mb": user_ctr_size.get("size_rootfs_mb"),
             }
 
-            score, sample_count = calculate_activity_score(user.name)
+            score, sample_count = scores.get(username, (None, 0))
             user_data["activity_score"] = score
-            user_data["activity_hours"] = calculate_avg_active_hours(user.name)
+            if sample_count:
+                user_data["activity_hours"] = monitor.get_avg_active_hours(username)
             user_data["sample_count"] = sample_count
 
-            inactive_threshold = get_inactive_after_seconds()
-            now = datetime.now(timezone.utc)
-
-            if spawner and spawner.orm_spawner:
+            if orm_spawner is not None:
                 # server uptime = when the spawner (container) started
-                started = getattr(spawner.orm_spawner, 'started', None)
+                started = getattr(orm_spawner, 'started', None)
                 if server_active and started:
                     started_utc = started.replace(tzinfo=timezone.utc) if started.tzinfo is None else started
                     user_data["server_started"] = started_utc.isoformat()
 
-                last_activity = spawner.orm_spawner.last_activity
+                last_activity = orm_spawner.last_activity
                 if last_activity:
                     last_activity_utc = last_activity.replace(tzinfo=timezone.utc) if last_activity.tzinfo is None else last_activity
                     elapsed_seconds = (now - last_activity_utc).total_seconds()
@@ -131,9 +162,8 @@ class ActivityDataHandler(BaseHandler):
                     user_data["recently_active"] = server_active and elapsed_seconds <= inactive_threshold
 
                     if server_active and culler_enabled:
-                        ceiling = calc_ceiling(timeout_seconds, max_extension_hours)
                         user_data["time_remaining_seconds"] = remaining_seconds_for(
-                            spawner.orm_spawner, timeout_seconds, ceiling, now
+                            orm_spawner, timeout_seconds, ceiling, now
                         )
                         user_data["timeout_seconds"] = timeout_seconds
 
@@ -203,7 +233,7 @@ class ActivityDataHandler(BaseHandler):
             "memory_max_usage_mb": memory_max,
             "memory_host_total_mb": _mem.get('host_total_mb'),
             "cpu_host_total": _cpu.get('host_total_cores'),
-            "activity_target_hours": get_activity_target_hours(),
+            "activity_target_hours": monitor.target_hours,
             # which host dimensions THIS environment exposes - the portal renders
             # only these rows, and no panel when the set is empty (presence-gated)
             "host_capabilities": host_capabilities,
@@ -214,13 +244,17 @@ class ActivityDataHandler(BaseHandler):
             "lab_image": lab_image,
             "lab_volumes": lab_volumes,
             "system_volumes": system_volumes,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now.isoformat(),
             "sampling_status": get_activity_sampling_status(),
-            "inactive_after_seconds": get_inactive_after_seconds(),
+            "inactive_after_seconds": inactive_threshold,
         }
 
         self.log.info(f"[Activity Data] Returning data for {len(users_data)} user(s)")
-        self.finish(response)
+        # Compact separators: the per-user rows dominate the body, and tornado's
+        # default encoding pads every key and value with a space. "</" is escaped
+        # as tornado's json_encode does.
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        self.finish(json.dumps(response, separators=(',', ':')).replace("</", "<\\/"))
 
 
 class ActivityResetHandler(BaseHandler):
@@ -251,7 +285,7 @@ class ActivitySampleHandler(BaseHandler):
             raise web.HTTPError(403, "Only administrators can trigger activity sampling")
 
         self.log.info(f"[Activity Sample] Admin {current_user.name} triggered activity sampling")
-        counts = record_samples_for_all_users(self.db, self.find_user)
+        counts = await record_samples_for_all_users(self.db, self.users)
 
         self.log.info(
             f"[Activity Sample] Recorded {counts['total']} samples: "
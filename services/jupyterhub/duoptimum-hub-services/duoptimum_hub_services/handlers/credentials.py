@@ -5,7 +5,7 @@ import json
 from jupyterhub.handlers import BaseHandler
 from tornado import web
 
-from ..password_cache import get_cached_password
+from ..password_cache import get_cached_passwords
 
 
 class GetUserCredentialsHandler(BaseHandler):
@@ -23,8 +23,7 @@ class GetUserCredentialsHandler(BaseHandler):
             raise web.HTTPError(403, "Only administrators can retrieve credentials")
 
         try:
-            body = self.request.body.decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = json.loads(self.request.body or b'{}')
             usernames = data.get('usernames', [])
         except Exception as e:
             self.log.error(f"[Get Credentials] Failed to parse request body: {e}")
@@ -32,14 +31,11 @@ class GetUserCredentialsHandler(BaseHandler):
 
         self.log.info(f"[Get Credentials] Admin {current_user.name} requesting credentials for: {usernames}")
 
-        credentials = []
-        for username in usernames:
-            password = get_cached_password(username)
-            if password:
-                credentials.append({"username": username, "password": password})
-                self.log.info(f"[Get Credentials] Found cached password for: {username}")
-            else:
-                self.log.info(f"[Get Credentials] No cached password for: {username}")
+        credentials = [
+            {"username": username, "password": password}
+            for username, password in get_cached_passwords(usernames).items()
+            if password
+        ]
 
-        self.log.info(f"[Get Credentials] Returning {len(credentials)} credential(s)")
+        self.log.info(f"[Get Credentials] Returning {len(credentials)}/{len(usernames)} credential(s)")
         self.finish({"credentials": credentials})
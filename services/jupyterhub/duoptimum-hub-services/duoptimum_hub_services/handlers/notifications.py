@@ -1,19 +1,133 @@
 """Handlers for notification broadcasting."""
 
 import asyncio
+import atexit
 import json
+import time
 
+import aiohttp
+from jupyterhub import orm
 from jupyterhub.handlers import BaseHandler
+from sqlalchemy.orm import selectinload
 from tornado import web
-from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.iostream import StreamClosedError
 
 from ..docker_utils import lab_container_name
+from ..event_log import record_event
+from ..sent_notification_log import record_sent_notification
 
 # The notification types the portal can broadcast - the single source of truth the
 # composer offers and the handler validates against. 'default' was retired (the
 # composer no longer offers it; 'info' is the default), so it is not accepted here.
 NOTIFICATION_TYPES = ('info', 'success', 'warning', 'error', 'in-progress')
 
+# Upper bound on a broadcast request body. The message itself is capped at 140
+# characters, so anything near this size is malformed and is refused up front.
+MAX_BROADCAST_BODY_BYTES = 4096
+
+# Connection pool for the broadcast fan-out: total sockets across all labs, and
+# kept-alive sockets per lab container so repeat broadcasts skip the TCP handshake.
+BROADCAST_MAX_CONNECTIONS = 256
+BROADCAST_CONNECTIONS_PER_LAB = 4
+BROADCAST_TIMEOUT = 5.0
+# Deliveries in flight per broadcast when JUPYTERHUB_BROADCAST_CONCURRENCY is unset.
+DEFAULT_BROADCAST_CONCURRENCY = 32
+
+_broadcast_session = None
+_broadcast_loop = None
+
+# Broadcast tokens are minted per user and reused until shortly before they expire,
+# so back-to-back broadcasts don't insert (and hash) a new API token per lab each time.
+BROADCAST_TOKEN_TTL = 300
+BROADCAST_TOKEN_MARGIN = 30
+_broadcast_tokens = {}  # username -> (token, monotonic expiry)
+
+
+def _broadcast_token(user):
+    """A live broadcast API token for ``user``, minted only when none is cached.
+
+    Runs on the event loop with no await between lookup and mint, so concurrent
+    deliveries cannot race into minting twice for the same user.
+    """
+    now = time.monotonic()
+    cached = _broadcast_tokens.get(user.name)
+    if cached and now < cached[1] - BROADCAST_TOKEN_MARGIN:
+        return cached[0]
+    token = user.new_api_token(note="notification-broadcast", expires_in=BROADCAST_TOKEN_TTL)
+    _broadcast_tokens[user.name] = (token, now + BROADCAST_TOKEN_TTL)
+    return token
+
+
+def _broadcast_client():
+    """Long-lived aiohttp session for the broadcast fan-out, created on first use.
+
+    Bound to the running loop; rebuilt if that loop changed or the session was
+    closed. The session is closed at hub exit (see _close_broadcast_client).
+    """
+    global _broadcast_session, _broadcast_loop
+    loop = asyncio.get_running_loop()
+    session = _broadcast_session
+    if session is None or session.closed or _broadcast_loop is not loop:
+        if session is None:
+            atexit.register(_close_broadcast_client)
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=BROADCAST_MAX_CONNECTIONS, limit_per_host=BROADCAST_CONNECTIONS_PER_LAB),
+            timeout=aiohttp.ClientTimeout(total=BROADCAST_TIMEOUT, connect=BROADCAST_TIMEOUT),
+        )
+        _broadcast_session, _broadcast_loop = session, loop
+    return session
+
+
+def _close_broadcast_client():
+    """Close the broadcast session on its own loop at hub exit.
+
+    ClientSession.close() is a coroutine, so it is run to completion on the loop
+    the session was bound to. When that loop is already closed (or somehow still
+    running) there is nothing safe to await; process exit releases the sockets.
+    """
+    global _broadcast_session, _broadcast_loop
+    session, loop = _broadcast_session, _broadcast_loop
+    _broadcast_session = _broadcast_loop = None
+    if session is None or session.closed or loop is None or loop.is_closed() or loop.is_running():
+        return
+    try:
+        loop.run_until_complete(session.close())
+    except Exception:
+        pass  # best-effort at exit
+
+
+def _active_server_query(handler, *entities, names=None):
+    """Query ``entities`` for users whose default spawner holds a server row.
+
+    The recipient filter, when given, runs in SQL too.
+    """
+    default_spawner = (orm.Spawner.user_id == orm.User.id) & (orm.Spawner.name == '')
+    query = (
+        handler.db.query(*entities)
+        .join(orm.Spawner, default_spawner)
+        .filter(orm.Spawner.server_id.isnot(None))
+    )
+    if names is not None:
+        query = query.filter(orm.User.name.in_(names))
+    return query
+
+
+def _active_users(handler, names=None):
+    """Users whose default server is active, optionally limited to ``names``.
+
+    The ORM rows come from one join (spawners loaded alongside in one SELECT ...
+    IN) and are wrapped through the hub's user dict, which reuses the loaded row -
+    find_user would re-SELECT each user by name. Idle accounts are never wrapped.
+    """
+    orm_users = (
+        _active_server_query(handler, orm.User, names=names)
+        .options(selectinload(orm.User._orm_spawners))
+        .all()
+    )
+    users = (handler.users[orm_user] for orm_user in orm_users)
+    return [user for user in users if user.spawner and user.spawner.active]
+
 
 class ActiveServersHandler(BaseHandler):
     """Handler for listing active servers for notification targeting."""
@@ -27,12 +141,8 @@ class ActiveServersHandler(BaseHandler):
 
         self.log.info(f"[Active Servers] Request from admin: {current_user.name}")
 
-        active_servers = []
-        from jupyterhub import orm
-        for orm_user in self.db.query(orm.User).all():
-            user = self.find_user(orm_user.name)
-            if user and user.spawner and user.spawner.active:
-                active_servers.append({"username": user.name})
+        # names straight from the join - nothing here needs a wrapped user
+        active_servers = [{"username": name} for (name,) in _active_server_query(self, orm.User.name).all()]
 
         self.log.info(f"[Active Servers] Found {len(active_servers)} active server(s)")
         self.finish({"servers": active_servers})
@@ -41,6 +151,16 @@ class ActiveServersHandler(BaseHandler):
 class BroadcastNotificationHandler(BaseHandler):
     """Handler for broadcasting notifications to active JupyterLab servers."""
 
+    async def prepare(self):
+        """Refuse oversized bodies before authentication and JSON parsing run."""
+        try:
+            content_length = int(self.request.headers.get('Content-Length', 0))
+        except ValueError:
+            raise web.HTTPError(400, "Invalid Content-Length")
+        if content_length > MAX_BROADCAST_BODY_BYTES:
+            raise web.HTTPError(413, "Request body too large")
+        await super().prepare()
+
     async def post(self):
         """Broadcast a notification to active JupyterLab servers.
 
@@ -51,6 +171,9 @@ class BroadcastNotificationHandler(BaseHandler):
             "autoClose": false,
             "recipients": ["user1", "user2"]  # optional
         }
+        Returns {"total", "successful", "failed", "details": [...]}; with
+        ``Accept: application/x-ndjson`` the detail rows stream one per line as
+        deliveries settle, followed by a {"total", "successful", "failed"} line.
         """
         current_user = self.current_user
         if current_user is None:
@@ -62,8 +185,7 @@ class BroadcastNotificationHandler(BaseHandler):
 
         # Parse request body
         try:
-            body = self.request.body.decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = json.loads(self.request.body or b'{}')
             message = data.get('message', '').strip()
             variant = data.get('variant', 'info')
             auto_close = data.get('autoClose', False)
@@ -80,20 +202,19 @@ class BroadcastNotificationHandler(BaseHandler):
         if variant not in NOTIFICATION_TYPES:
             raise web.HTTPError(400, f"Variant must be one of: {', '.join(NOTIFICATION_TYPES)}")
 
-        # Get active spawners
-        active_spawners = []
-        from jupyterhub import orm
-        for orm_user in self.db.query(orm.User).all():
-            user = self.find_user(orm_user.name)
-            if user and user.spawner and user.spawner.active:
-                active_spawners.append((user, user.spawner))
+        # Get active spawners, narrowed to the recipients (if specified) in the query
+        names = set(recipients) if recipients and isinstance(recipients, list) else None
+        active_spawners = [(user, user.spawner) for user in _active_users(self, names)]
 
-        # Filter by recipients if specified
-        if recipients and isinstance(recipients, list) and len(recipients) > 0:
-            recipients_set = set(recipients)
-            active_spawners = [(u, s) for u, s in active_spawners if u.name in recipients_set]
+        # Opt-in streaming: a client that accepts NDJSON gets each detail row as its
+        # delivery settles, so one hung lab (5 s timeout) doesn't hold back the rest;
+        # the summary follows as the last line. Default stays one JSON object.
+        ndjson = 'application/x-ndjson' in self.request.headers.get('Accept', '')
 
         if not active_spawners:
+            if ndjson:
+                self.set_header('Content-Type', 'application/x-ndjson')
+                return self.finish(json.dumps({"total": 0, "successful": 0, "failed": 0}) + "\n")
             return self.finish({
                 "total": 0, "successful": 0, "failed": 0,
                 "details": [], "message": "No active servers found",
@@ -106,67 +227,97 @@ class BroadcastNotificationHandler(BaseHandler):
             "actions": [{"label": "Dismiss", "caption": "Close this notification", "displayType": "default"}],
         }
 
-        tasks = [self._send_notification(user, spawner, notification_payload) for user, spawner in active_spawners]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        successful = 0
-        failed = 0
-        details = []
-
-        for (user, spawner), result in zip(active_spawners, results):
-            if isinstance(result, dict) and result.get('status') == 'success':
-                successful += 1
-                details.append({"username": user.name, "status": "success"})
-            else:
-                failed += 1
-                error_msg = str(result) if isinstance(result, Exception) else result.get('error', 'Unknown error')
-                details.append({"username": user.name, "status": "failed", "error": error_msg})
+        # Encode the wire body once for the whole fan-out; every lab gets the same bytes.
+        payload_bytes = json.dumps(notification_payload, separators=(',', ':')).encode()
+        summary = f"'{message[:50]}' ({variant})"  # per-lab log line prefix, built once too
+
+        # Cap deliveries in flight so a fleet-wide broadcast opens at most this many
+        # sockets (and lab DNS lookups) at once instead of one per active server.
+        limit = self.settings['stellars_config'].get('broadcast_concurrency') or DEFAULT_BROADCAST_CONCURRENCY
+        semaphore = asyncio.Semaphore(max(1, limit))
+
+        # Each delivery returns its own detail row (username included), so the
+        # gathered list is the response body as-is - no zip back over the targets.
+        async def _deliver(user, spawner):
+            async with semaphore:
+                try:
+                    result = await self._send_notification(user, spawner, payload_bytes, summary)
+                except Exception as e:
+                    result = {"status": "failed", "error": str(e)}
+            if result.get('status') == 'success':
+                return {"username": user.name, "status": "success"}
+            return {"username": user.name, "status": "failed", "error": result.get('error', 'Unknown error')}
+
+        deliveries = [_deliver(user, spawner) for user, spawner in active_spawners]
+        if ndjson:
+            streaming = True
+            self.set_header('Content-Type', 'application/x-ndjson')
+            details = []
+            for settled in asyncio.as_completed(deliveries):
+                detail = await settled
+                details.append(detail)
+                if streaming:
+                    try:
+                        self.write(json.dumps(detail) + "\n")
+                        await self.flush()
+                    except StreamClosedError:
+                        streaming = False  # admin went away; keep delivering, stop writing
+        else:
+            details = await asyncio.gather(*deliveries)
+        successful = sum(1 for d in details if d["status"] == "success")
+        failed = len(details) - successful
 
         total = len(active_spawners)
         self.log.info(f"[Broadcast Notification] Complete: {successful}/{total} successful, {failed}/{total} failed")
 
-        from ..event_log import record_event
         record_event('broadcast', f'Broadcast sent to <b>{successful}</b> active server{"s" if successful != 1 else ""}')
 
         # persist to the sent-notification history so the portal "Past Notifications" feed reflects it
-        from ..sent_notification_log import record_sent_notification
         record_sent_notification(message, variant, successful, total)
 
         self.set_status(200)
-        self.finish({"total": total, "successful": successful, "failed": failed, "details": details})
+        if ndjson:
+            self.finish(json.dumps({"total": total, "successful": successful, "failed": failed}) + "\n")
+        else:
+            self.finish({"total": total, "successful": successful, "failed": failed, "details": details})
 
-    async def _send_notification(self, user, spawner, notification_payload):
+    async def _send_notification(self, user, spawner, payload_bytes, summary):
+        """POST the pre-encoded payload to one lab; ``summary`` prefixes the log line."""
         username = user.name
 
         try:
-            token = user.new_api_token(note="notification-broadcast", expires_in=300)
-
             if not spawner.server:
                 return {"status": "failed", "error": "Server not available"}
 
+            token = _broadcast_token(user)
+
             base_url = spawner.server.base_url
             container_url = f"http://{lab_container_name(username)}:8888"
             endpoint = f"{container_url}{base_url}jupyterlab-notifications-extension/ingest"
 
-            http_client = AsyncHTTPClient()
-            request = HTTPRequest(
-                url=endpoint,
-                method="POST",
+            async with _broadcast_client().post(
+                endpoint,
+                data=payload_bytes,
                 headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
-                body=json.dumps(notification_payload),
-                request_timeout=5.0,
-                connect_timeout=5.0,
-            )
-
-            response = await http_client.fetch(request, raise_error=False)
-
-            if response.code == 200:
-                self.log.info(f"[Notification] {username}: '{notification_payload['message'][:50]}' ({notification_payload['type']}) - SUCCESS")
+            ) as response:
+                status, reason = response.status, response.reason
+                await response.read()  # drain so the socket goes back to the keep-alive pool
+
+            if status == 200:
+                # per-lab success is DEBUG (the post() summary line is the INFO record);
+                # %-args so a filtered line costs no formatting on the loop
+                self.log.debug("[Notification] %s: %s - SUCCESS", username, summary)
                 return {"status": "success"}
             else:
-                error_msg = f"HTTP {response.code}: {response.reason}"
-                self.log.warning(f"[Notification] {username}: '{notification_payload['message'][:50]}' ({notification_payload['type']}) - FAILED: {error_msg}")
+                error_msg = f"HTTP {status}: {reason}"
+                if status in (401, 403):
+                    _broadcast_tokens.pop(username, None)  # revoked/rejected: mint afresh next time
+                self.log.warning("[Notification] %s: %s - FAILED: %s", username, summary, error_msg)
                 return {"status": "failed", "error": error_msg}
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            error_msg = "Server not responding"
+            self.log.error("[Notification] %s: %s - ERROR: %s", username, summary, error_msg)
+            return {"status": "failed", "error": error_msg}
         except Exception as e:
             error_msg = str(e)
             if "Connection refused" in error_msg or "Connection timed out" in error_msg:
@@ -176,5 +327,5 @@ class BroadcastNotificationHandler(BaseHandler):
             elif "401" in error_msg or "403" in error_msg:
                 error_msg = "Authentication failed"
 
-            self.log.error(f"[Notification] {username}: '{notification_payload['message'][:50]}' ({notification_payload['type']}) - ERROR: {error_msg}")
+            self.log.error("[Notification] %s: %s - ERROR: %s", username, summary, error_msg)
             return {"status": "failed", "error": error_msg}
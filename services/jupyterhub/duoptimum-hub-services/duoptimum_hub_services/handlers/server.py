@@ -7,7 +7,12 @@ import docker
 from jupyterhub.handlers import BaseHandler
 from tornado import web
 
-from ..docker_utils import get_docker_client, get_executor, lab_container_name
+from ..docker_utils import (
+    get_executor,
+    get_shared_docker_api_client,
+    get_shared_docker_client,
+    lab_container_name,
+)
 
 
 class RestartServerHandler(BaseHandler):
@@ -42,17 +47,18 @@ class RestartServerHandler(BaseHandler):
         container_name = lab_container_name(username)
 
         try:
-            docker_client = get_docker_client()
+            docker_api = get_shared_docker_api_client()
         except Exception as e:
             self.log.error(f"[Restart Server] Failed to connect to Docker: {e}")
             raise web.HTTPError(500, "Failed to connect to Docker daemon")
 
-        # container.restart() blocks up to 10s+; run the Docker calls on the shared
+        # container restart blocks up to 10s+; run the Docker call on the shared
         # executor so one user's restart can't freeze the hub event loop for every
-        # other user. Tornado response I/O and error mapping stay on the loop.
+        # other user. Tornado response I/O and error mapping stay on the loop. The
+        # low-level API restarts by name in one request (no containers.get() inspect
+        # round-trip and model hydration first); a missing container raises NotFound.
         def _restart():
-            container = docker_client.containers.get(container_name)
-            # [Timing] probes around container.restart() so the operator can
+            # [Timing] probes around the restart so the operator can
             # see in the hub log how long the Docker-side restart took. The
             # full user-visible restart includes additional lab-boot time on
             # top of this duration; the home.html poll observes that part.
@@ -63,7 +69,7 @@ class RestartServerHandler(BaseHandler):
             )
             t0 = time.perf_counter()
             try:
-                container.restart(timeout=10)
+                docker_api.restart(container_name, timeout=10)
             finally:
                 self.log.info(
                     "[Timing] container.restart() returned in %.3fs user=%s",
@@ -83,8 +89,6 @@ class RestartServerHandler(BaseHandler):
         except docker.errors.APIError as e:
             self.log.error(f"[Restart Server] Failed to restart container {container_name}: {e}")
             raise web.HTTPError(500, f"Failed to restart container: {str(e)}")
-        finally:
-            docker_client.close()
 
 
 class ServerLogsHandler(BaseHandler):
@@ -115,7 +119,7 @@ class ServerLogsHandler(BaseHandler):
 
         container_name = lab_container_name(username)
         try:
-            docker_client = get_docker_client()
+            docker_client = get_shared_docker_client()
         except Exception as e:
             self.log.error(f"[Server Logs] Failed to connect to Docker: {e}")
             raise web.HTTPError(500, "Failed to connect to Docker daemon")
@@ -138,5 +142,3 @@ class ServerLogsHandler(BaseHandler):
         except docker.errors.APIError as e:
             self.log.error(f"[Server Logs] Failed to read logs for {container_name}: {e}")
             raise web.HTTPError(500, "Failed to read container logs")
-        finally:
-            docker_client.close()
@@ -11,6 +11,7 @@ import json
 from datetime import datetime, timedelta, timezone
 
 from jupyterhub.handlers import BaseHandler
+from sqlalchemy.orm.attributes import flag_modified
 from tornado import web
 
 from duoptimum_hub_services.idle_culler import (
@@ -96,8 +97,7 @@ class ExtendSessionHandler(BaseHandler):
             raise web.HTTPError(403, "Permission denied")
 
         try:
-            body = self.request.body.decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = json.loads(self.request.body or b'{}')
             hours = data.get('hours', 1)
             if not isinstance(hours, (int, float)) or hours <= 0:
                 raise ValueError("Invalid hours value")
@@ -150,14 +150,19 @@ class ExtendSessionHandler(BaseHandler):
         new_remaining = calc_extended_remaining(remaining, hours, ceiling, maxed)
 
         # Persist the deadline; drop the legacy budget key so this server runs on
-        # the deadline model from now on.
-        new_state = dict(spawner.orm_spawner.state or {})
-        new_state['cull_at'] = (now + timedelta(seconds=new_remaining)).isoformat()
+        # the deadline model from now on. The state dict is updated in place - the
+        # column is a plain JSON type without mutation tracking, so it is flagged
+        # dirty explicitly rather than copied and reassigned.
+        orm_spawner = spawner.orm_spawner
+        if orm_spawner.state is None:
+            orm_spawner.state = {}
+        state = orm_spawner.state
+        state['cull_at'] = (now + timedelta(seconds=new_remaining)).isoformat()
         # bar high-water mark = remaining now extended TO: bar reads 100% on extend,
         # drains vs this, not the far ceiling
-        new_state['display_ceiling'] = new_remaining
-        new_state.pop('extension_hours_used', None)
-        spawner.orm_spawner.state = new_state
+        state['display_ceiling'] = new_remaining
+        state.pop('extension_hours_used', None)
+        flag_modified(orm_spawner, 'state')
         self.db.commit()
 
         new_available = calc_available_hours(new_remaining, ceiling)
@@ -9,6 +9,26 @@ from ..logging_setup import log
 
 SETTINGS_DICT_PATH = "/srv/jupyterhub/settings_dictionary.yml"
 
+# Parsed dictionary keyed by path, reused while the file's mtime is unchanged. Only
+# the parse is cached - env values are resolved on every call, so they stay live.
+_settings_dict_cache = {}  # path -> (mtime, parsed config)
+
+
+def _parsed_settings_dict(path):
+    """The parsed YAML at ``path``, re-read only when its mtime changes."""
+    import yaml
+
+    mtime = os.stat(path).st_mtime
+    cached = _settings_dict_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    # libyaml's C loader when PyYAML was built with it, else the pure-Python one
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path, 'r') as f:
+        config = yaml.load(f, Loader=loader)
+    _settings_dict_cache[path] = (mtime, config)
+    return config
+
 
 def load_settings_dict(path=SETTINGS_DICT_PATH):
     """Load the settings dictionary and resolve each entry's live env value.
@@ -16,12 +36,9 @@ def load_settings_dict(path=SETTINGS_DICT_PATH):
     Returns a flat list of ``{category, name, value, description}`` in file
     order. Read-only: these are the running env values, never written here.
     """
-    import yaml
-
     settings = []
     try:
-        with open(path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = _parsed_settings_dict(path)
 
         for category, items in config.items():
             if not isinstance(items, list):
@@ -8,8 +8,15 @@ import docker
 from jupyterhub.handlers import BaseHandler
 from tornado import web
 
-from ..docker_utils import encode_username_for_docker, get_docker_client, get_executor
+from ..docker_utils import (
+    encode_username_for_docker,
+    get_executor,
+    get_shared_docker_api_client,
+    get_shared_docker_client,
+)
 from ..event_log import record_event
+from ..groups_config import GroupsConfigManager
+from ..policy import resolve_policies
 
 
 class ManageVolumesHandler(BaseHandler):
@@ -34,7 +41,7 @@ class ManageVolumesHandler(BaseHandler):
         templates = self.settings['stellars_config']['user_volume_name_templates']
         encoded = encode_username_for_docker(username)
         try:
-            client = get_docker_client()
+            client = get_shared_docker_client()
         except Exception as e:
             self.log.error(f"[Manage Volumes] Failed to connect to Docker: {e}")
             raise web.HTTPError(500, "Failed to connect to Docker daemon")
@@ -112,10 +119,7 @@ class ManageVolumesHandler(BaseHandler):
             return existing
 
         loop = asyncio.get_running_loop()
-        try:
-            existing = await loop.run_in_executor(get_executor(), _list_volumes)
-        finally:
-            client.close()  # close on every path (parity with the restart/logs/delete handlers)
+        existing = await loop.run_in_executor(get_executor(), _list_volumes)
 
         self.log.info(f"[Manage Volumes] {username} has {len(existing)} volume(s) on disk")
         self.set_status(200)
@@ -134,8 +138,6 @@ class ManageVolumesHandler(BaseHandler):
             shared_name = cfg.get('shared_volume_name', '')
             if not shared_name:
                 return None
-            from ..groups_config import GroupsConfigManager
-            from ..policy import resolve_policies
             user = self.find_user(username)
             group_names = [g.name for g in user.groups] if user else []
             resolved = resolve_policies(
@@ -182,8 +184,7 @@ class ManageVolumesHandler(BaseHandler):
 
         # Parse request body
         try:
-            body = self.request.body.decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = json.loads(self.request.body or b'{}')
             requested_volumes = data.get('volumes', [])
             self.log.info(f"[Manage Volumes] Requested volumes: {requested_volumes}")
         except Exception as e:
@@ -199,8 +200,7 @@ class ManageVolumesHandler(BaseHandler):
         # built once from DOCKER_SPAWNER_VOLUMES at config-load time. Avoids
         # the handler re-deriving the name pattern and drifting from spawner.
         user_volume_name_templates = self.settings['stellars_config']['user_volume_name_templates']
-        valid_volumes = set(user_volume_suffixes)
-        invalid_volumes = set(requested_volumes) - valid_volumes
+        invalid_volumes = set(requested_volumes).difference(user_volume_suffixes)
         if invalid_volumes:
             self.log.warning(f"[Manage Volumes] Invalid volume types: {invalid_volumes}")
             raise web.HTTPError(400, f"Invalid volume types: {invalid_volumes}")
@@ -216,42 +216,54 @@ class ManageVolumesHandler(BaseHandler):
             raise web.HTTPError(400, "Server must be stopped before resetting volumes")
 
         try:
-            docker_client = get_docker_client()
+            docker_api = get_shared_docker_api_client()
         except Exception as e:
             self.log.error(f"[Manage Volumes] Failed to connect to Docker: {e}")
             raise web.HTTPError(500, "Failed to connect to Docker daemon")
 
         encoded_username = encode_username_for_docker(username)
 
-        # volume.remove() is a blocking Docker call, once per requested volume;
-        # run the whole loop on the shared executor so a multi-volume reset can't
-        # freeze the hub event loop for other users. Each volume's error handling
-        # is unchanged - the loop accumulates reset/failed and returns them.
-        def _remove_volumes():
-            reset, failed = [], []
-            for volume_type in requested_volumes:
-                volume_name = user_volume_name_templates[volume_type].replace('{username}', encoded_username)
-                self.log.info(f"[Manage Volumes] Processing volume: {volume_name}")
-                try:
-                    volume = docker_client.volumes.get(volume_name)
-                    volume.remove()
-                    self.log.info(f"[Manage Volumes] Successfully removed volume {volume_name}")
-                    reset.append(volume_type)
-                except docker.errors.NotFound:
-                    self.log.warning(f"[Manage Volumes] Volume {volume_name} not found, skipping")
-                    failed.append({"volume": volume_type, "reason": "not found"})
-                except docker.errors.APIError as e:
-                    self.log.error(f"[Manage Volumes] Failed to remove volume {volume_name}: {e}")
-                    failed.append({"volume": volume_type, "reason": str(e)})
-            return reset, failed
-
+        # One low-level volume list (name filter = the encoded username, a substring
+        # match) resolves every requested volume in a single Docker round-trip, as
+        # plain dicts - no Volume model hydration. Every Docker call runs on the
+        # shared executor so a reset can't freeze the hub event loop for other users.
         loop = asyncio.get_running_loop()
-        try:
-            reset_volumes, failed_volumes = await loop.run_in_executor(get_executor(), _remove_volumes)
-        finally:
-            # close on every path (incl. an unexpected non-APIError transport error
-            # escaping the per-volume try) - parity with the restart/logs handlers.
-            docker_client.close()
+
+        def _list_existing():
+            listed = docker_api.volumes(filters={'name': encoded_username}).get('Volumes') or []
+            return {v['Name'] for v in listed}
+
+        existing = await loop.run_in_executor(get_executor(), _list_existing)
+
+        reset_volumes, failed_volumes = [], []
+        targets = []  # (volume_type, volume_name) that exist and get removed
+        for volume_type in requested_volumes:
+            volume_name = user_volume_name_templates[volume_type].replace('{username}', encoded_username)
+            self.log.info(f"[Manage Volumes] Processing volume: {volume_name}")
+            if volume_name in existing:
+                targets.append((volume_type, volume_name))
+            else:
+                self.log.warning(f"[Manage Volumes] Volume {volume_name} not found, skipping")
+                failed_volumes.append({"volume": volume_type, "reason": "not found"})
+
+        # The removals are independent, so they run concurrently: wall time is the
+        # slowest single remove rather than the sum over all requested volumes.
+        results = await asyncio.gather(
+            *(loop.run_in_executor(get_executor(), docker_api.remove_volume, name) for _, name in targets),
+            return_exceptions=True,
+        )
+        for (volume_type, volume_name), result in zip(targets, results):
+            if isinstance(result, docker.errors.NotFound):
+                self.log.warning(f"[Manage Volumes] Volume {volume_name} not found, skipping")
+                failed_volumes.append({"volume": volume_type, "reason": "not found"})
+            elif isinstance(result, docker.errors.APIError):
+                self.log.error(f"[Manage Volumes] Failed to remove volume {volume_name}: {result}")
+                failed_volumes.append({"volume": volume_type, "reason": str(result)})
+            elif isinstance(result, BaseException):
+                raise result  # transport/daemon failure -> 500, as before
+            else:
+                self.log.info(f"[Manage Volumes] Successfully removed volume {volume_name}")
+                reset_volumes.append(volume_type)
 
         # audit the destructive reset on the event log (best-effort; never raises).
         # Names the actor and, when an admin resets someone else's volumes, the owner.
@@ -27,7 +27,8 @@ from .logging_setup import log
 
 def start_activity_refreshers(gpu_list=None):
     """Start the background activity refreshers (idempotent). Each ``start()`` also
-    submits an immediate first refresh, so the caches warm right away. GPU
+    schedules a first refresh within seconds (randomly staggered so the refreshers do
+    not hit docker together), so the caches warm right away. GPU
     utilisation is started only when the host has GPUs (enumerated at boot), to
     avoid pointless sidecar polling on a GPU-less host."""
     from .volume_cache import VolumeSizeRefresher
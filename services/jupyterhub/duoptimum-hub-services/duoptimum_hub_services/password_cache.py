@@ -5,23 +5,51 @@ import time
 _password_cache = {}
 _CACHE_EXPIRY_SECONDS = 300  # 5 minutes
 
+# A 5-minute TTL tolerates tick-level granularity, so read the coarse monotonic
+# clock where the platform offers it (Linux) - cheaper than the full-resolution path.
+if hasattr(time, 'CLOCK_MONOTONIC_COARSE'):
+    def coarse_now():
+        """Coarse monotonic clock reading in seconds."""
+        return time.clock_gettime(time.CLOCK_MONOTONIC_COARSE)
+else:
+    coarse_now = time.monotonic
+
 
 def cache_password(username, password):
     """Store a password in the cache with timestamp."""
-    _password_cache[username] = (password, time.time())
+    _password_cache[username] = (password, coarse_now())
 
 
 def get_cached_password(username):
     """Get a password from cache if not expired."""
     if username in _password_cache:
         password, timestamp = _password_cache[username]
-        if time.time() - timestamp < _CACHE_EXPIRY_SECONDS:
+        if coarse_now() - timestamp < _CACHE_EXPIRY_SECONDS:
             return password
         else:
             del _password_cache[username]
     return None
 
 
+def get_cached_passwords(usernames):
+    """Bulk lookup: {username: password} for every unexpired entry among `usernames`.
+
+    One clock read for the whole batch; expired entries are evicted as they are met.
+    """
+    now = coarse_now()
+    found = {}
+    for username in usernames:
+        entry = _password_cache.get(username)
+        if entry is None:
+            continue
+        password, timestamp = entry
+        if now - timestamp < _CACHE_EXPIRY_SECONDS:
+            found[username] = password
+        else:
+            del _password_cache[username]
+    return found
+
+
 def clear_cached_password(username):
     """Remove a password from cache."""
     _password_cache.pop(username, None)
@@ -24,9 +24,10 @@ import os
 import re
 import threading
 import time
+from collections import defaultdict
 from datetime import datetime, timezone
 
-from .docker_utils import get_executor
+from .docker_utils import REFRESH_JITTER, first_refresh_delay, get_executor
 from .logging_setup import log
 from .persisted_cache import load_cached, save_cached
 
@@ -40,8 +41,13 @@ _refresh_lock = threading.Lock()
 # Volume-name template config (set by configure_volume_cache at hub startup).
 # _volume_name_templates: {suffix: template_string_with_{username}_placeholder}
 # _template_regexes:      [(suffix, compiled_regex_with_username_group), ...]
+# _volume_name_regex:     all templates as one anchored alternation, group u<i> = the
+#                         username for template i (None when nothing is configured)
+# _regex_group_suffix:    {'u<i>': suffix} - maps the matched group back to its suffix
 _volume_name_templates = {}
 _template_regexes = []
+_volume_name_regex = None
+_regex_group_suffix = {}
 
 
 def _get_volumes_update_interval():
@@ -102,16 +108,24 @@ def configure_volume_cache(templates):
     only needs touching the templates helper, not this module.
 
     Each template is compiled to a regex that anchors the full volume name and
-    captures the encoded username; _fetch_volume_sizes tries every regex per disk
-    volume, first match wins.
+    captures the encoded username; the templates are also joined into one alternation
+    so _fetch_volume_sizes matches each disk volume with a single regex call, first
+    template wins.
     """
-    global _volume_name_templates, _template_regexes
+    global _volume_name_templates, _template_regexes, _volume_name_regex, _regex_group_suffix
     _volume_name_templates = dict(templates)
     _template_regexes = []
+    alternatives = []
+    group_suffix = {}
     placeholder = re.escape('{username}')
-    for suffix, template in _volume_name_templates.items():
-        pattern = '^' + re.escape(template).replace(placeholder, '(.+)') + '$'
-        _template_regexes.append((suffix, re.compile(pattern)))
+    for i, (suffix, template) in enumerate(_volume_name_templates.items()):
+        escaped = re.escape(template)
+        _template_regexes.append((suffix, re.compile('^' + escaped.replace(placeholder, '(.+)') + '$')))
+        alternatives.append(escaped.replace(placeholder, f'(?P<u{i}>.+)'))
+        group_suffix[f'u{i}'] = suffix
+    # alternation is tried left to right, so the first matching template still wins
+    _volume_name_regex = re.compile('^(?:' + '|'.join(alternatives) + ')$') if alternatives else None
+    _regex_group_suffix = group_suffix
     log.info(
         f"[Volume Sizes] Configured {len(_volume_name_templates)} name template(s): "
         f"{list(_volume_name_templates.keys())}"
@@ -123,7 +137,7 @@ def _fetch_volume_sizes():
     """Fetch all user-volume sizes via `docker system df`. Returns (data, complete);
     `complete` is False when any matched volume is still mid-computation (df -1) or the
     call errored, so the caller never caches a partial snapshot (DEF-7)."""
-    if not _template_regexes:
+    if _volume_name_regex is None:
         log.warning(
             "[Volume Sizes] No volume-name templates configured; cache will be empty. "
             "Call configure_volume_cache(user_volume_name_templates) at hub startup."
@@ -138,50 +152,40 @@ def _fetch_via_df():
     volume carries the lazy-df -1 sentinel (not yet computed) or the call errors - the
     caller waits for a complete pass instead of caching the partial result (DEF-7)."""
     try:
-        from .docker_utils import get_docker_api_client
-        api_client = get_docker_api_client(timeout=_get_docker_timeout())
-        try:
-            df_data = api_client._get(api_client._url('/system/df'), params={'type': 'volume'}).json()
-            volumes_data = df_data.get('Volumes', []) or []
-
-            user_data = {}
-            complete = True
-            pending = 0
-            for vol in volumes_data:
-                name = vol.get('Name', '')
-                for suffix, regex in _template_regexes:
-                    m = regex.match(name)
-                    if not m:
-                        continue
-                    encoded_username = m.group(1)
-                    usage_data = vol.get('UsageData', {}) or {}
-                    size_bytes = usage_data.get('Size', 0) or 0
-                    if size_bytes < 0:
-                        complete = False  # not-yet-computed (-1); skip + mark pass partial (DEF-7)
-                        pending += 1
-                        break
-                    size_mb = round(size_bytes / (1024 * 1024), 1)
-
-                    if encoded_username not in user_data:
-                        user_data[encoded_username] = {"total": 0, "volumes": {}}
-                    user_data[encoded_username]["total"] += size_mb
-                    user_data[encoded_username]["volumes"][suffix] = size_mb
-                    break  # first matching template wins
-
-            for user in user_data:
-                user_data[user]["total"] = round(user_data[user]["total"], 1)
-
-            total_size = sum(u["total"] for u in user_data.values())
-            if complete:
-                log.info(f"[Volume Sizes] Fetched (complete): {len(user_data)} users, {total_size:.1f} MB")
-            else:
-                log.info(
-                    f"[Volume Sizes] df still computing: {pending} user volume(s) pending (-1); "
-                    "not caching this partial pass"
-                )
-            return user_data, complete
-        finally:
-            api_client.close()
+        from .docker_utils import get_shared_docker_api_client
+        api_client = get_shared_docker_api_client(timeout=_get_docker_timeout())
+        df_data = api_client._get(api_client._url('/system/df'), params={'type': 'volume'}).json()
+        volumes_data = df_data.get('Volumes', []) or []
+
+        match = _volume_name_regex.match
+        user_volumes = defaultdict(dict)  # encoded_username -> {suffix: size_mb}
+        complete = True
+        pending = 0
+        for vol in volumes_data:
+            m = match(vol.get('Name', ''))
+            if m is None:
+                continue
+            size_bytes = (vol.get('UsageData') or {}).get('Size', 0) or 0
+            if size_bytes < 0:
+                complete = False  # not-yet-computed (-1); skip + mark pass partial (DEF-7)
+                pending += 1
+                continue
+            user_volumes[m[m.lastgroup]][_regex_group_suffix[m.lastgroup]] = round(size_bytes / (1024 * 1024), 1)
+
+        user_data = {
+            user: {"total": round(sum(volumes.values()), 1), "volumes": volumes}
+            for user, volumes in user_volumes.items()
+        }
+
+        total_size = sum(u["total"] for u in user_data.values())
+        if complete:
+            log.info(f"[Volume Sizes] Fetched (complete): {len(user_data)} users, {total_size:.1f} MB")
+        else:
+            log.info(
+                f"[Volume Sizes] df still computing: {pending} user volume(s) pending (-1); "
+                "not caching this partial pass"
+            )
+        return user_data, complete
     except Exception as e:
         log.error(f"[Volume Sizes] Error fetching: {e}")
         return {}, False
@@ -268,17 +272,17 @@ class VolumeSizeRefresher:
         log.info(f"[VolumeSizeRefresher] Initialized with interval={self.interval_seconds}s")
 
     def start(self):
-        from tornado.ioloop import PeriodicCallback
+        from tornado.ioloop import IOLoop, PeriodicCallback
 
         if self.periodic_callback is not None:
             return  # already scheduled; quiet - start() is called on every activity poll
 
         interval_ms = self.interval_seconds * 1000
-        self.periodic_callback = PeriodicCallback(self._refresh_tick, interval_ms)
+        self.periodic_callback = PeriodicCallback(self._refresh_tick, interval_ms, jitter=REFRESH_JITTER)
         self.periodic_callback.start()
         log.info(f"[VolumeSizeRefresher] Started - refreshing every {self.interval_seconds}s")
 
-        get_executor().submit(_refresh_volume_sizes_sync)
+        IOLoop.current().call_later(first_refresh_delay(self.interval_seconds), self._refresh_tick)
 
     def stop(self):
         if self.periodic_callback is not None:
@@ -4,10 +4,10 @@ import logging
 import os
 
 import pytest
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from duoptimum_hub_services.activity.model import ActivityBase
+from duoptimum_hub_services.activity.model import create_activity_engine
 from duoptimum_hub_services.activity.monitor import ActivityMonitor
 from duoptimum_hub_services.logging_setup import logger as _loguru_logger
 
@@ -49,20 +49,31 @@ def reset_activity_monitor():
 
 @pytest.fixture
 def memory_db_monitor(reset_activity_monitor):
-    """Create ActivityMonitor wired to in-memory SQLite. Returns ready instance."""
+    """Create ActivityMonitor wired to in-memory SQLite. Returns ready instance.
+
+    StaticPool keeps the single in-memory connection shared by every session the
+    monitor opens, so they all see the same database.
+    """
     monitor = ActivityMonitor.get_instance()
 
-    engine = create_engine("sqlite:///:memory:")
-    ActivityBase.metadata.create_all(engine)
-    session = sessionmaker(bind=engine)()
+    engine = create_activity_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
 
     monitor._engine = engine
-    monitor._db_session = session
+    monitor._session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
     monitor._initialized = True
 
     return monitor
 
 
+@pytest.fixture
+def activity_db(memory_db_monitor):
+    """A session on the monitor's in-memory DB for seeding and inspecting samples."""
+    session = memory_db_monitor._session_factory()
+    yield session
+    session.close()
+
+
 @pytest.fixture
 def clean_password_cache():
     """Clear password cache before and after test."""
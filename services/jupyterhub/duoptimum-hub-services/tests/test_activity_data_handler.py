@@ -0,0 +1,164 @@
+"""ActivityDataHandler.get: which users the outerjoin pre-filter loads and wraps.
+
+Driven against an in-memory DB carrying the real JupyterHub tables (as in
+test_rename_sync.py). The handler is built via __new__ (mirrors
+test_handler_async.py); the size/stats caches, refreshers and the activity monitor
+are stubbed so only the user query and the per-user loop run.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from duoptimum_hub_services.handlers import activity as activity_mod
+from duoptimum_hub_services.handlers.activity import ActivityDataHandler
+
+_LOG = logging.getLogger("test_activity_data_handler")
+
+
+class _FakeUsers(dict):
+    """Stands in for the hub's UserDict: keyed by user id, indexable by orm.User.
+
+    Like the real one, indexing by an orm.User wraps (and keeps) it on demand;
+    every wrap is recorded so tests can assert who was materialised.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.wrapped = []
+
+    def wrap(self, orm_user, active):
+        orm_spawner = next((s for s in orm_user._orm_spawners if s.name == ''), None)
+        self[orm_user.id] = SimpleNamespace(
+            name=orm_user.name, spawner=SimpleNamespace(active=active, orm_spawner=orm_spawner))
+
+    def __getitem__(self, key):
+        if not isinstance(key, int):
+            if key.id not in self:
+                self.wrap(key, active=False)
+            self.wrapped.append(key.name)
+            key = key.id
+        return super().__getitem__(key)
+
+
+class _FakeMonitor:
+    inactive_after_minutes = 60
+    target_hours = 8
+
+    def __init__(self, scores):
+        self._scores = scores
+
+    def get_scores_bulk(self):
+        return dict(self._scores)
+
+    def get_avg_active_hours(self, username):
+        return 1.5
+
+
+@pytest.fixture
+def orm_session():
+    """In-memory DB with the JupyterHub tables plus a NativeAuth-shaped users_info."""
+    from jupyterhub import orm as jh_orm
+
+    engine = create_engine("sqlite://")
+    jh_orm.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.execute(text("CREATE TABLE users_info (username TEXT, is_authorized BOOLEAN)"))
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    """Names the per-user loop processed (every loaded row is docker-encoded once)."""
+    seen = set()
+
+    def _encode(name):
+        seen.add(name)
+        return name
+
+    monkeypatch.setattr(activity_mod, "encode_username_for_docker", _encode)
+    monkeypatch.setattr(activity_mod, "start_activity_refreshers", lambda gpu_list=None: None)
+    monkeypatch.setattr(activity_mod, "get_volume_sizes_with_refresh", lambda: {})
+    monkeypatch.setattr(activity_mod, "get_container_sizes_with_refresh", lambda: {})
+    monkeypatch.setattr(activity_mod, "get_container_stats_with_refresh", lambda active: {})
+    monkeypatch.setattr(activity_mod, "get_activity_sampling_status", lambda: {})
+    return seen
+
+
+def _add_user(session, name, spawner=False, server=False, last_activity=None):
+    from jupyterhub import orm as jh_orm
+
+    user = jh_orm.User(name=name)
+    if spawner or server or last_activity:
+        orm_spawner = jh_orm.Spawner(name='', last_activity=last_activity)
+        if server:
+            orm_spawner.server = jh_orm.Server()
+        user._orm_spawners.append(orm_spawner)
+    session.add(user)
+    session.commit()
+    return user
+
+
+def _data_handler(monkeypatch, session, users, scores):
+    monkeypatch.setattr(activity_mod, "ActivityMonitor", SimpleNamespace(get_instance=lambda: _FakeMonitor(scores)))
+    h = ActivityDataHandler.__new__(ActivityDataHandler)
+    h.application = SimpleNamespace(settings={
+        "log": _LOG,
+        "db": session,
+        "users": users,
+        "stellars_config": {
+            "idle_culler_enabled": 0, "idle_culler_timeout": 3600, "idle_culler_max_extension": 24,
+        },
+    })
+    h._jupyterhub_user = SimpleNamespace(admin=True, name="admin")
+    find_user_calls = []
+    h.find_user = lambda name: find_user_calls.append(name)
+    cap = {"headers": {}}
+    h.set_header = lambda name, value: cap["headers"].__setitem__(name, value)
+    h.finish = lambda body=None: cap.__setitem__("body", json.loads(body))
+    return h, cap, find_user_calls
+
+
+def test_prefilter_loads_only_users_that_can_produce_a_row(monkeypatch, orm_session, loaded):
+    _add_user(orm_session, "ghost")  # no spawner row, no samples, not wrapped
+    pending = _add_user(orm_session, "pending", spawner=True)  # spawn in flight: wrapped, no server row yet
+    _add_user(orm_session, "sampled")  # samples only
+    users = _FakeUsers()
+    users.wrap(pending, active=True)
+    h, cap, find_user_calls = _data_handler(monkeypatch, orm_session, users, {"sampled": (40.0, 3)})
+
+    asyncio.run(h.get())
+
+    rows = {u["username"]: u for u in cap["body"]["users"]}
+    assert "ghost" not in loaded  # filtered out in SQL, never reached the loop
+    assert set(rows) == {"pending", "sampled"}
+    assert rows["pending"]["server_active"] is True
+    assert rows["sampled"]["server_active"] is False
+    assert rows["sampled"]["sample_count"] == 3 and rows["sampled"]["activity_hours"] == 1.5
+    assert users.wrapped == ["pending"]  # the sample-only user is never wrapped
+    assert find_user_calls == []  # wrappers come from the user dict, no re-SELECT by name
+
+
+def test_server_row_wraps_and_last_activity_alone_does_not(monkeypatch, orm_session, loaded):
+    recent = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=5)
+    live = _add_user(orm_session, "live", server=True, last_activity=recent)
+    _add_user(orm_session, "stopped", spawner=True, last_activity=recent - timedelta(days=1))
+    users = _FakeUsers()
+    users.wrap(live, active=True)
+    h, cap, find_user_calls = _data_handler(monkeypatch, orm_session, users, {})
+
+    asyncio.run(h.get())
+
+    rows = {u["username"]: u for u in cap["body"]["users"]}
+    assert set(rows) == {"live", "stopped"}
+    assert rows["live"]["server_active"] is True and rows["live"]["recently_active"] is True
+    assert rows["stopped"]["server_active"] is False and rows["stopped"]["last_activity"]
+    assert users.wrapped == ["live"]
+    assert find_user_calls == []
@@ -27,8 +27,10 @@ def _seed_window(monitor, username, active_every):
         rows.append(ActivitySample(
             username=username, timestamp=ts,
             last_activity=(ts if active else ts - timedelta(hours=3)), active=active))
-    monitor._db_session.add_all(rows)
-    monitor._db_session.commit()
+    db = monitor._session_factory()
+    db.add_all(rows)
+    db.commit()
+    db.close()
 
 
 # ---------------------------------------------------------------------------
@@ -36,34 +38,34 @@ def _seed_window(monitor, username, active_every):
 # ---------------------------------------------------------------------------
 
 class TestRecording:
-    def test_active_sample(self, memory_db_monitor):
+    def test_active_sample(self, memory_db_monitor, activity_db):
         """Recent last_activity marks sample as active."""
         now = datetime.now(timezone.utc)
         assert memory_db_monitor.record_sample("alice", now - timedelta(seconds=10))
 
         from duoptimum_hub_services.activity.model import ActivitySample
-        row = memory_db_monitor._db_session.query(ActivitySample).one()
+        row = activity_db.query(ActivitySample).one()
         assert row.username == "alice"
         assert row.active is True
 
-    def test_inactive_sample(self, memory_db_monitor):
+    def test_inactive_sample(self, memory_db_monitor, activity_db):
         """Stale last_activity marks sample as inactive."""
         stale = datetime.now(timezone.utc) - timedelta(hours=3)
         memory_db_monitor.record_sample("bob", stale)
 
         from duoptimum_hub_services.activity.model import ActivitySample
-        row = memory_db_monitor._db_session.query(ActivitySample).one()
+        row = activity_db.query(ActivitySample).one()
         assert row.active is False
 
-    def test_none_last_activity(self, memory_db_monitor):
+    def test_none_last_activity(self, memory_db_monitor, activity_db):
         """None last_activity marks sample as inactive."""
         memory_db_monitor.record_sample("carol", None)
 
         from duoptimum_hub_services.activity.model import ActivitySample
-        row = memory_db_monitor._db_session.query(ActivitySample).one()
+        row = activity_db.query(ActivitySample).one()
         assert row.active is False
 
-    def test_multiple_samples_accumulate(self, memory_db_monitor):
+    def test_multiple_samples_accumulate(self, memory_db_monitor, activity_db):
         """Multiple record_sample calls create separate rows."""
         now = datetime.now(timezone.utc)
         memory_db_monitor.record_sample("dave", now)
@@ -71,24 +73,65 @@ class TestRecording:
         memory_db_monitor.record_sample("dave", now)
 
         from duoptimum_hub_services.activity.model import ActivitySample
-        count = memory_db_monitor._db_session.query(ActivitySample).filter_by(username="dave").count()
+        count = activity_db.query(ActivitySample).filter_by(username="dave").count()
         assert count == 3
 
-    def test_old_samples_pruned_on_record(self, memory_db_monitor):
-        """Recording prunes samples older than retention_days for that user."""
+    def test_single_record_leaves_pruning_to_batch(self, memory_db_monitor, activity_db):
+        """record_sample only inserts; expired rows go with the periodic prune."""
         from duoptimum_hub_services.activity.model import ActivitySample
 
         old_ts = datetime.now(timezone.utc) - timedelta(days=memory_db_monitor.retention_days + 1)
-        memory_db_monitor._db_session.add(ActivitySample(
+        activity_db.add(ActivitySample(
             username="eve", timestamp=old_ts, last_activity=old_ts, active=True,
         ))
-        memory_db_monitor._db_session.commit()
+        activity_db.commit()
 
         now = datetime.now(timezone.utc)
         memory_db_monitor.record_sample("eve", now)
+        assert activity_db.query(ActivitySample).filter_by(username="eve").count() == 2
 
-        count = memory_db_monitor._db_session.query(ActivitySample).filter_by(username="eve").count()
-        assert count == 1  # old sample pruned, only new one remains
+        assert memory_db_monitor.prune_old_samples() == 1
+        assert activity_db.query(ActivitySample).filter_by(username="eve").count() == 1
+
+    def test_bulk_prune_runs_once_per_interval(self, memory_db_monitor, activity_db):
+        """After a prune, batches skip the DELETE until prune_interval has elapsed."""
+        from duoptimum_hub_services.activity.model import ActivitySample
+
+        memory_db_monitor.record_samples_bulk([("alice", None)])  # first batch prunes
+        old_ts = datetime.now(timezone.utc) - timedelta(days=memory_db_monitor.retention_days + 1)
+        activity_db.add(ActivitySample(username="old", timestamp=old_ts, active=False))
+        activity_db.commit()
+
+        memory_db_monitor.record_samples_bulk([("alice", None)])
+        assert activity_db.query(ActivitySample).filter_by(username="old").count() == 1
+
+        memory_db_monitor._last_prune -= memory_db_monitor.prune_interval
+        memory_db_monitor.record_samples_bulk([("alice", None)])
+        assert activity_db.query(ActivitySample).filter_by(username="old").count() == 0
+
+    def test_bulk_records_all_and_prunes_once(self, memory_db_monitor, activity_db):
+        """record_samples_bulk writes one row per pair and prunes expired rows for all users."""
+        from duoptimum_hub_services.activity.model import ActivitySample
+
+        old_ts = datetime.now(timezone.utc) - timedelta(days=memory_db_monitor.retention_days + 1)
+        activity_db.add(ActivitySample(
+            username="zoe", timestamp=old_ts, last_activity=old_ts, active=True,
+        ))
+        activity_db.commit()
+
+        now = datetime.now(timezone.utc)
+        written = memory_db_monitor.record_samples_bulk([
+            ("alice", now - timedelta(seconds=10)),
+            ("bob", now - timedelta(hours=3)),
+            ("carol", None),
+        ])
+        assert written == 3
+
+        rows = {r.username: r for r in activity_db.query(ActivitySample).all()}
+        assert set(rows) == {"alice", "bob", "carol"}  # zoe's expired sample pruned
+        assert rows["alice"].active is True
+        assert rows["bob"].active is False
+        assert rows["carol"].active is False
 
 
 # ---------------------------------------------------------------------------
@@ -109,23 +152,23 @@ class TestScoring:
         assert count > 0
         assert score == 100
 
-    def test_all_inactive_score_0(self, memory_db_monitor):
+    def test_all_inactive_score_0(self, memory_db_monitor, activity_db):
         """All inactive samples -> score 0."""
         from duoptimum_hub_services.activity.model import ActivitySample
 
         now = datetime.now(timezone.utc)
         for i in range(5):
-            memory_db_monitor._db_session.add(ActivitySample(
+            activity_db.add(ActivitySample(
                 username="bob", timestamp=now - timedelta(minutes=i),
                 last_activity=now - timedelta(hours=3), active=False,
             ))
-        memory_db_monitor._db_session.commit()
+        activity_db.commit()
 
         score, count = memory_db_monitor.get_score("bob")
         assert count == 5
         assert score == 0
 
-    def test_decay_weights_recent_more(self, memory_db_monitor):
+    def test_decay_weights_recent_more(self, memory_db_monitor, activity_db):
         """The same amount of active time scores higher when it is recent."""
         from duoptimum_hub_services.activity.model import ActivitySample
 
@@ -134,18 +177,58 @@ class TestScoring:
         # 48 active samples (~8h) placed recently for "fresh", the same 48 placed
         # ~6 days back for "stale" - both within the 7-day window, same active time.
         for k in range(48):
-            memory_db_monitor._db_session.add(ActivitySample(
+            activity_db.add(ActivitySample(
                 username="fresh", timestamp=now - k * dt, last_activity=now, active=True))
         for k in range(48):
             old_ts = now - timedelta(days=6) - k * dt
-            memory_db_monitor._db_session.add(ActivitySample(
+            activity_db.add(ActivitySample(
                 username="stale", timestamp=old_ts, last_activity=old_ts, active=True))
-        memory_db_monitor._db_session.commit()
+        activity_db.commit()
 
         fresh_score, _ = memory_db_monitor.get_score("fresh")
         stale_score, _ = memory_db_monitor.get_score("stale")
         assert fresh_score > stale_score  # recent active time dominates due to decay
 
+    def test_bulk_scores_match_per_user(self, memory_db_monitor):
+        """get_scores_bulk returns the same (score, count) get_score does, from one query."""
+        _seed_window(memory_db_monitor, "alice", active_every=1)
+        _seed_window(memory_db_monitor, "halfday", active_every=6)
+
+        bulk = memory_db_monitor.get_scores_bulk()
+        memory_db_monitor._fraction_cache.clear()
+        assert bulk == {
+            "alice": memory_db_monitor.get_score("alice"),
+            "halfday": memory_db_monitor.get_score("halfday"),
+        }
+
+    def test_score_cache_cleared_by_write(self, memory_db_monitor):
+        """A cached score is dropped once the monitor records a new sample."""
+        now = datetime.now(timezone.utc)
+        memory_db_monitor.record_sample("frank", now - timedelta(hours=3))
+        assert memory_db_monitor.get_score("frank") == (0, 1)
+
+        memory_db_monitor.record_sample("frank", now)
+        _, count = memory_db_monitor.get_score("frank")
+        assert count == 2
+
+    def test_activity_levels_bucket_in_sql(self, memory_db_monitor, activity_db):
+        """_activity_levels buckets every user by score; aged-out users count as 'none'."""
+        from duoptimum_hub_services.activity.model import ActivitySample
+
+        _seed_window(memory_db_monitor, "alice", active_every=1)    # 100 -> very-high
+        _seed_window(memory_db_monitor, "halfday", active_every=6)  # ~50 -> normal
+        memory_db_monitor.record_sample("idle", None)                 # 0 -> none
+        old_ts = datetime.now(timezone.utc) - timedelta(days=memory_db_monitor.retention_days + 1)
+        activity_db.add(ActivitySample(username="gone", timestamp=old_ts, last_activity=old_ts, active=True))
+        activity_db.commit()
+
+        levels = memory_db_monitor._activity_levels(activity_db)
+        assert levels == {'very-high': 1, 'high': 0, 'normal': 1, 'low': 0, 'very-low': 0, 'none': 2}
+
+        # the tick passes the users it just sampled instead of re-counting the table
+        levels = memory_db_monitor._activity_levels(activity_db, ["alice", "halfday", "idle", "gone"])
+        assert levels == {'very-high': 1, 'high': 0, 'normal': 1, 'low': 0, 'very-low': 0, 'none': 2}
+
 
 # ---------------------------------------------------------------------------
 # Target-hours normalisation (the under-reporting fix)
@@ -200,10 +283,12 @@ class TestNewUserRamp:
         from duoptimum_hub_services.activity.model import ActivitySample
         now = datetime.now(timezone.utc)
         dt = timedelta(seconds=monitor.sample_interval)
-        monitor._db_session.add_all([
+        db = monitor._session_factory()
+        db.add_all([
             ActivitySample(username=username, timestamp=now - k * dt,
                            last_activity=now, active=True) for k in range(n)])
-        monitor._db_session.commit()
+        db.commit()
+        db.close()
 
     def test_new_active_user_does_not_spike(self, memory_db_monitor):
         """~1h of solid activity on a new account reads low, not the old 100/300%."""
@@ -222,16 +307,16 @@ class TestNewUserRamp:
         later, _ = memory_db_monitor.get_score("later")
         assert later > early
 
-    def test_avg_active_hours_never_exceeds_24(self, memory_db_monitor):
+    def test_avg_active_hours_never_exceeds_24(self, memory_db_monitor, activity_db):
         """Active fraction caps at 1.0 - hours can never exceed 24 (sampler jitter)."""
         from duoptimum_hub_services.activity.model import ActivitySample
         now = datetime.now(timezone.utc)
         n_slots = int(round(
             memory_db_monitor.retention_days * 24 * 3600 / memory_db_monitor.sample_interval))
-        memory_db_monitor._db_session.add_all([
+        activity_db.add_all([
             ActivitySample(username="jitter", timestamp=now, last_activity=now, active=True)
             for _ in range(n_slots + 200)])  # more active samples than expected slots
-        memory_db_monitor._db_session.commit()
+        activity_db.commit()
         assert memory_db_monitor.get_avg_active_hours("jitter") == 24.0
 
 
@@ -260,20 +345,20 @@ class TestUserManagement:
         _, count = memory_db_monitor.get_score("doomed")
         assert count == 0
 
-    def test_prune_old_samples(self, memory_db_monitor):
+    def test_prune_old_samples(self, memory_db_monitor, activity_db):
         """prune_old_samples removes expired samples for all users."""
         from duoptimum_hub_services.activity.model import ActivitySample
 
         old_ts = datetime.now(timezone.utc) - timedelta(days=memory_db_monitor.retention_days + 1)
-        memory_db_monitor._db_session.add(ActivitySample(
+        activity_db.add(ActivitySample(
             username="stale", timestamp=old_ts, last_activity=old_ts, active=True,
         ))
-        memory_db_monitor._db_session.commit()
+        activity_db.commit()
 
         pruned = memory_db_monitor.prune_old_samples()
         assert pruned == 1
 
-    def test_reset_all_clears_everything(self, memory_db_monitor):
+    def test_reset_all_clears_everything(self, memory_db_monitor, activity_db):
         now = datetime.now(timezone.utc)
         memory_db_monitor.record_sample("user1", now)
         memory_db_monitor.record_sample("user2", now)
@@ -282,7 +367,7 @@ class TestUserManagement:
         assert deleted == 2
 
         from duoptimum_hub_services.activity.model import ActivitySample
-        assert memory_db_monitor._db_session.query(ActivitySample).count() == 0
+        assert activity_db.query(ActivitySample).count() == 0
 
 
 # ---------------------------------------------------------------------------
@@ -323,3 +408,200 @@ class TestConfig:
         monitor = ActivityMonitor.get_instance()
         expected = math.log(2) / monitor.half_life_hours
         assert abs(monitor.decay_lambda - expected) < 1e-10
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+class TestEngine:
+    def test_file_db_uses_wal_and_normal_sync(self, tmp_path):
+        """create_activity_engine applies the WAL/synchronous pragmas on connect."""
+        from sqlalchemy import text
+
+        from duoptimum_hub_services.activity.model import create_activity_engine
+
+        engine = create_activity_engine(f"sqlite:///{tmp_path / 'activity.sqlite'}")
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        engine.dispose()
+
+    def test_superseded_indexes_dropped(self, tmp_path):
+        """An existing DB loses the old (username, timestamp) index in favour of the covering one."""
+        import sqlite3
+
+        from duoptimum_hub_services.activity.model import create_activity_engine
+
+        path = tmp_path / 'activity.sqlite'
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE activity_samples (id INTEGER PRIMARY KEY, username VARCHAR(255) NOT NULL, "
+            "timestamp DATETIME NOT NULL, last_activity DATETIME, active BOOLEAN)")
+        conn.execute("CREATE INDEX ix_activity_user_time ON activity_samples (username, timestamp)")
+        conn.execute("CREATE INDEX ix_activity_samples_username ON activity_samples (username)")
+        conn.commit()
+        conn.close()
+
+        create_activity_engine(f"sqlite:///{path}").dispose()
+
+        conn = sqlite3.connect(path)
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert 'ix_activity_user_time_active' in names
+        assert 'ix_activity_samples_timestamp' in names
+        assert not names & {'ix_activity_user_time', 'ix_activity_samples_username'}
+
+    def test_datetime_rows_migrated_to_epoch_seconds(self, tmp_path):
+        """Rows an older schema stored as DateTime text are converted to integer epochs."""
+        import sqlite3
+
+        from duoptimum_hub_services.activity.model import create_activity_engine
+
+        path = tmp_path / 'activity.sqlite'
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE activity_samples (id INTEGER PRIMARY KEY, username VARCHAR(255) NOT NULL, "
+            "timestamp DATETIME NOT NULL, last_activity DATETIME, active BOOLEAN)")
+        conn.execute(
+            "INSERT INTO activity_samples (username, timestamp, last_activity, active) VALUES "
+            "('alice', '2026-01-02 03:04:05.678000', NULL, 1)")
+        conn.commit()
+        conn.close()
+
+        create_activity_engine(f"sqlite:///{path}").dispose()
+
+        conn = sqlite3.connect(path)
+        ts, ts_type, la = conn.execute(
+            "SELECT timestamp, typeof(timestamp), last_activity FROM activity_samples").fetchone()
+        conn.close()
+        assert ts_type == 'integer'
+        assert ts == int(datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc).timestamp())
+        assert la is None
+
+    def test_conversion_runs_once_per_db_file(self, tmp_path):
+        """After the first open stamps user_version, later opens skip the table scan."""
+        import sqlite3
+
+        from duoptimum_hub_services.activity.model import _SCHEMA_VERSION, create_activity_engine
+
+        path = tmp_path / 'activity.sqlite'
+        create_activity_engine(f"sqlite:///{path}").dispose()
+
+        conn = sqlite3.connect(path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == _SCHEMA_VERSION
+        # a text row slipped in after conversion is left alone: the gate, not typeof(), skips it
+        conn.execute(
+            "INSERT INTO activity_samples (username, timestamp, last_activity, active) VALUES "
+            "('bob', '2026-01-02 03:04:05', NULL, 0)")
+        conn.commit()
+        conn.close()
+
+        create_activity_engine(f"sqlite:///{path}").dispose()
+
+        conn = sqlite3.connect(path)
+        ts_type = conn.execute("SELECT typeof(timestamp) FROM activity_samples").fetchone()[0]
+        conn.close()
+        assert ts_type == 'text'
+
+
+class TestEpochStorage:
+    def test_timestamps_stored_as_integers(self, memory_db_monitor, activity_db):
+        """Samples land as integer epoch seconds and read back as aware UTC datetimes."""
+        from sqlalchemy import text
+
+        from duoptimum_hub_services.activity.model import ActivitySample
+
+        memory_db_monitor.record_samples_bulk([("alice", datetime(2026, 1, 1, 12, 0))])
+        types = activity_db.execute(
+            text("SELECT typeof(timestamp), typeof(last_activity), last_activity FROM activity_samples")).one()
+        assert types[:2] == ('integer', 'integer')
+        assert types[2] == int(datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc).timestamp())
+        row = activity_db.query(ActivitySample).one()
+        assert row.last_activity == datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Sampling every hub user (helpers.record_samples_for_all_users)
+# ---------------------------------------------------------------------------
+
+class TestSampleAllUsers:
+    @pytest.fixture
+    def hub_db(self):
+        """In-memory DB with the JupyterHub tables (as in test_rename_sync.py)."""
+        from jupyterhub import orm as jh_orm
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        engine = create_engine("sqlite://")
+        jh_orm.Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    @staticmethod
+    def _add_user(db, name, server=False, spawner=False, last_activity=None):
+        from jupyterhub import orm as jh_orm
+
+        user = jh_orm.User(name=name)
+        if server or spawner:
+            orm_spawner = jh_orm.Spawner(name='', last_activity=last_activity)
+            if server:
+                orm_spawner.server = jh_orm.Server()
+            user._orm_spawners.append(orm_spawner)
+        db.add(user)
+        db.commit()
+
+    class _Users(dict):
+        """Stands in for the hub's UserDict: indexing by a loaded orm.User wraps it
+        (no query), recording who was wrapped."""
+
+        def __init__(self, active=True):
+            super().__init__()
+            self.active = active
+            self.wrapped = []
+
+        def __getitem__(self, orm_user):
+            from types import SimpleNamespace
+
+            self.wrapped.append(orm_user.name)
+            return SimpleNamespace(name=orm_user.name, spawner=SimpleNamespace(active=self.active))
+
+    def test_only_server_rows_wrapped_and_counts_unchanged(self, memory_db_monitor, activity_db, hub_db):
+        """Only users holding a server row are wrapped; the active / inactive /
+        offline split is the one the per-user find_user walk produced."""
+        import asyncio
+
+        from duoptimum_hub_services.activity.helpers import record_samples_for_all_users
+        from duoptimum_hub_services.activity.model import ActivitySample
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # hub stores naive UTC
+        threshold = timedelta(minutes=memory_db_monitor.inactive_after_minutes)
+        self._add_user(hub_db, "busy", server=True, last_activity=now - timedelta(minutes=1))
+        self._add_user(hub_db, "idle", server=True, last_activity=now - threshold - timedelta(minutes=5))
+        self._add_user(hub_db, "fresh", server=True)  # running, no activity yet
+        self._add_user(hub_db, "stopped", spawner=True, last_activity=now - timedelta(days=1))
+        self._add_user(hub_db, "never")  # no spawner row at all
+        users = self._Users()
+
+        counts = asyncio.run(record_samples_for_all_users(hub_db, users))
+
+        assert sorted(users.wrapped) == ["busy", "fresh", "idle"]
+        assert counts == {'total': 5, 'active': 1, 'inactive': 2, 'offline': 2}
+        rows = {r.username: r for r in activity_db.query(ActivitySample).all()}
+        assert set(rows) == {"busy", "idle", "fresh", "stopped", "never"}
+        assert rows["stopped"].last_activity is not None  # offline users keep their last activity
+        assert rows["never"].last_activity is None
+
+    def test_server_row_with_inactive_spawner_is_offline(self, memory_db_monitor, activity_db, hub_db):
+        """A server row whose wrapped spawner reports inactive counts as offline."""
+        import asyncio
+
+        from duoptimum_hub_services.activity.helpers import record_samples_for_all_users
+
+        self._add_user(hub_db, "stopping", server=True)
+
+        counts = asyncio.run(record_samples_for_all_users(hub_db, self._Users(active=False)))
+
+        assert counts == {'total': 1, 'active': 0, 'inactive': 0, 'offline': 1}
@@ -0,0 +1,86 @@
+"""Functional tests for ActivitySamplerService - the standalone sampler's batch write
+and its interval-gated retention prune, on an in-memory SQLite DB."""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from duoptimum_hub_services.activity.model import ActivitySample, create_activity_engine
+from duoptimum_hub_services.activity.service import ActivitySamplerService
+
+
+@pytest.fixture
+def sampler():
+    """Sampler service whose session is bound to a fresh in-memory DB."""
+    service = ActivitySamplerService()
+    engine = create_activity_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    service._engine = engine
+    service._session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    yield service
+    service._session.close()
+
+
+def _iso(dt):
+    return dt.isoformat().replace('+00:00', 'Z')
+
+
+def _seed_expired(service, username="old"):
+    """One sample past the retention window."""
+    expired = int(time.time()) - (service.retention_days + 1) * 86400
+    service._session.execute(ActivitySample.__table__.insert(), [
+        {'username': username, 'timestamp': expired, 'last_activity': None, 'active': False},
+    ])
+    service._session.commit()
+
+
+def test_batch_rows_inserted(sampler):
+    now = datetime.now(timezone.utc)
+    written = sampler.record_samples([
+        ("alice", _iso(now - timedelta(seconds=10))),
+        ("bob", _iso(now - timedelta(hours=3))),
+        ("carol", None),
+    ])
+    assert written == 3
+
+    rows = {r.username: r for r in sampler._session.query(ActivitySample).all()}
+    assert set(rows) == {"alice", "bob", "carol"}
+    assert rows["alice"].active is True
+    assert rows["bob"].active is False
+    assert rows["carol"].active is False and rows["carol"].last_activity is None
+    assert len({r.timestamp for r in rows.values()}) == 1, "one timestamp per tick"
+
+
+def test_first_batch_prunes(sampler):
+    _seed_expired(sampler)
+    assert sampler._last_prune is None
+
+    sampler.record_samples([("alice", None)])
+
+    names = [r.username for r in sampler._session.query(ActivitySample).all()]
+    assert names == ["alice"]
+    assert sampler._last_prune is not None
+
+
+def test_prune_skipped_inside_interval(sampler):
+    sampler.record_samples([("alice", None)])  # first batch: prunes, starts the interval
+    _seed_expired(sampler)
+
+    sampler.record_samples([("alice", None)])
+
+    names = sorted(r.username for r in sampler._session.query(ActivitySample).all())
+    assert names == ["alice", "alice", "old"], "expired row waits for the next due prune"
+
+
+def test_prune_runs_again_once_interval_elapsed(sampler):
+    sampler.record_samples([("alice", None)])
+    _seed_expired(sampler)
+    sampler._last_prune = time.monotonic() - sampler.prune_interval
+
+    sampler.record_samples([("alice", None)])
+
+    names = sorted(r.username for r in sampler._session.query(ActivitySample).all())
+    assert names == ["alice", "alice"]
@@ -59,6 +59,26 @@ class TestFavicon:
         assert result['favicon_uri'] == ''
         assert (share_dir / "favicon.ico").exists()
 
+    def test_unchanged_file_not_recopied(self, monkeypatch, tmp_path):
+        """A static copy matching the source by size+mtime is left alone; a changed source is recopied."""
+        favicon = tmp_path / "favicon.ico"
+        favicon.write_bytes(b'\x00\x00\x01\x00')
+        share_dir = tmp_path / "share" / "jupyterhub" / "static"
+        share_dir.mkdir(parents=True)
+        monkeypatch.setattr("duoptimum_hub_services.branding.sys", type("sys", (), {"prefix": str(tmp_path)})())
+
+        from duoptimum_hub_services import branding
+        branding.setup_branding(favicon_uri=f"file://{favicon}")
+
+        copies = []
+        monkeypatch.setattr(branding.shutil, "copy2", lambda src, dst: copies.append(src))
+        branding.setup_branding(favicon_uri=f"file://{favicon}")
+        assert copies == []
+
+        favicon.write_bytes(b'\x00\x00\x01\x00\x01')
+        branding.setup_branding(favicon_uri=f"file://{favicon}")
+        assert copies == [str(favicon)]
+
     def test_url_passes_through(self):
         """URL favicon passes through in favicon_uri."""
         from duoptimum_hub_services.branding import setup_branding
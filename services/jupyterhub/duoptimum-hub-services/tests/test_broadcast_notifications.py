@@ -0,0 +1,439 @@
+"""BroadcastNotificationHandler fan-out: response shapes, per-lab delivery, session shutdown.
+
+Handlers are built via __new__ (mirrors test_handler_async.py); the active-user
+query and the history/event writers are stubbed so only the fan-out runs, and a
+fake session stands in for the shared aiohttp client.
+"""
+
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from duoptimum_hub_services.handlers import notifications as notifications_mod
+from duoptimum_hub_services.handlers.notifications import ActiveServersHandler, BroadcastNotificationHandler
+
+_LOG = logging.getLogger("test_broadcast_notifications")
+
+
+@pytest.fixture(autouse=True)
+def fresh_token_cache(monkeypatch):
+    monkeypatch.setattr(notifications_mod, "_broadcast_tokens", {})
+
+
+def _user(name):
+    return SimpleNamespace(name=name, spawner=SimpleNamespace(active=True))
+
+
+def _broadcast_handler(monkeypatch, users, accept="", config=None):
+    monkeypatch.setattr(notifications_mod, "_active_users", lambda handler, names=None: list(users))
+    monkeypatch.setattr(notifications_mod, "record_event", lambda *a, **k: None)
+    monkeypatch.setattr(notifications_mod, "record_sent_notification", lambda *a, **k: None)
+    h = BroadcastNotificationHandler.__new__(BroadcastNotificationHandler)
+    h.application = SimpleNamespace(settings={"log": _LOG, "stellars_config": config or {}})
+    h._jupyterhub_user = SimpleNamespace(admin=True, name="admin")
+    h.request = SimpleNamespace(
+        body=json.dumps({"message": "hello", "variant": "info"}).encode(),
+        headers={"Accept": accept},
+    )
+    cap = {"headers": {}, "chunks": [], "flushes": 0}
+
+    async def _flush():
+        cap["flushes"] += 1
+
+    h.set_header = lambda name, value: cap["headers"].__setitem__(name, value)
+    h.set_status = lambda code: cap.__setitem__("status", code)
+    h.write = lambda chunk: cap["chunks"].append(chunk)
+    h.flush = _flush
+    h.finish = lambda body=None: cap.__setitem__("body", body)
+    return h, cap
+
+
+def _ndjson_lines(cap):
+    return [json.loads(line) for line in "".join(cap["chunks"] + [cap["body"]]).splitlines()]
+
+
+async def _fake_send(self, user, spawner, payload_bytes, summary):
+    if user.name == "bob":
+        return {"status": "failed", "error": "HTTP 500: Internal Server Error"}
+    return {"status": "success"}
+
+
+class _FakeResponse:
+    def __init__(self, status, reason="OK"):
+        self.status, self.reason = status, reason
+        self.drained = False
+
+    async def read(self):
+        self.drained = True
+        return b""
+
+
+class _FakePost:
+    def __init__(self, outcome):
+        self._outcome = outcome
+
+    async def __aenter__(self):
+        if isinstance(self._outcome, BaseException):
+            raise self._outcome
+        return self._outcome
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    """Stands in for the shared aiohttp session; ``outcome`` is a response or an exception."""
+
+    def __init__(self, outcome=None):
+        self.outcome = outcome if outcome is not None else _FakeResponse(200)
+        self.posts = []
+        self.closed = False
+
+    def post(self, url, data=None, headers=None):
+        self.posts.append({"url": url, "data": data, "headers": headers})
+        return _FakePost(self.outcome)
+
+    async def close(self):
+        self.closed = True
+
+
+class _TokenUser:
+    """A user with a default server whose new_api_token() mints numbered tokens."""
+
+    def __init__(self, name="alice"):
+        self.name = name
+        self.minted = 0
+        self.spawner = SimpleNamespace(active=True, server=SimpleNamespace(base_url=f"/user/{name}/"))
+
+    def new_api_token(self, note=None, expires_in=None):
+        self.minted += 1
+        return f"{self.name}-token-{self.minted}"
+
+
+def _send(monkeypatch, session, user=None):
+    monkeypatch.setattr(notifications_mod, "_broadcast_client", lambda: session)
+    h, _ = _broadcast_handler(monkeypatch, [])
+    user = user or _TokenUser()
+    return asyncio.run(h._send_notification(user, user.spawner, b'{"message":"hello"}', "'hello' (info)"))
+
+
+# ── response shapes ──────────────────────────────────────────────────────────
+
+def test_default_response_is_one_json_object(monkeypatch):
+    monkeypatch.setattr(BroadcastNotificationHandler, "_send_notification", _fake_send)
+    h, cap = _broadcast_handler(monkeypatch, [_user("alice"), _user("bob")])
+
+    asyncio.run(h.post())
+
+    assert cap["chunks"] == []
+    assert cap["body"]["total"] == 2 and cap["body"]["successful"] == 1 and cap["body"]["failed"] == 1
+    assert [d["username"] for d in cap["body"]["details"]] == ["alice", "bob"]
+
+
+def test_ndjson_streams_one_line_per_delivery_then_summary(monkeypatch):
+    monkeypatch.setattr(BroadcastNotificationHandler, "_send_notification", _fake_send)
+    users = [_user("alice"), _user("bob"), _user("carol")]
+    h, cap = _broadcast_handler(monkeypatch, users, accept="application/x-ndjson")
+
+    asyncio.run(h.post())
+
+    assert cap["headers"]["Content-Type"] == "application/x-ndjson"
+    lines = _ndjson_lines(cap)
+    details, summary = lines[:-1], lines[-1]
+    assert len(cap["chunks"]) == 3 and cap["flushes"] == 3  # each row flushed as it settled
+    assert sorted(d["username"] for d in details) == ["alice", "bob", "carol"]
+    assert {d["username"]: d["status"] for d in details}["bob"] == "failed"
+    assert summary == {"total": 3, "successful": 2, "failed": 1}
+
+
+def test_ndjson_with_no_active_servers_emits_summary_line(monkeypatch):
+    h, cap = _broadcast_handler(monkeypatch, [], accept="application/x-ndjson")
+
+    asyncio.run(h.post())
+
+    assert cap["headers"]["Content-Type"] == "application/x-ndjson"
+    assert cap["chunks"] == []
+    assert cap["body"].endswith("\n")
+    assert _ndjson_lines(cap) == [{"total": 0, "successful": 0, "failed": 0}]
+
+
+def test_no_active_servers_default_response_unchanged(monkeypatch):
+    h, cap = _broadcast_handler(monkeypatch, [])
+
+    asyncio.run(h.post())
+
+    assert cap["headers"] == {}
+    assert cap["body"]["total"] == 0
+    assert cap["body"]["message"] == "No active servers found"
+
+
+def test_ndjson_client_gone_keeps_delivering(monkeypatch):
+    monkeypatch.setattr(BroadcastNotificationHandler, "_send_notification", _fake_send)
+    h, cap = _broadcast_handler(monkeypatch, [_user("alice"), _user("carol")], accept="application/x-ndjson")
+
+    async def _closed_flush():
+        raise notifications_mod.StreamClosedError()
+
+    h.flush = _closed_flush
+
+    asyncio.run(h.post())
+
+    assert len(cap["chunks"]) == 1  # stopped writing after the first failed flush
+    assert json.loads(cap["body"]) == {"total": 2, "successful": 2, "failed": 0}
+
+
+# ── single delivery (_send_notification) ─────────────────────────────────────
+
+def test_send_success_posts_payload_with_bearer_token(monkeypatch):
+    session = _FakeSession(_FakeResponse(200))
+
+    result = _send(monkeypatch, session)
+
+    assert result == {"status": "success"}
+    (post,) = session.posts
+    assert post["url"].endswith("/user/alice/jupyterlab-notifications-extension/ingest")
+    assert post["data"] == b'{"message":"hello"}'
+    assert post["headers"]["Authorization"] == "Bearer alice-token-1"
+    assert session.outcome.drained  # body read so the socket returns to the pool
+
+
+def test_send_http_error_reports_status_and_reason(monkeypatch):
+    session = _FakeSession(_FakeResponse(404, "Not Found"))
+
+    assert _send(monkeypatch, session) == {"status": "failed", "error": "HTTP 404: Not Found"}
+
+
+@pytest.mark.parametrize("exc", [asyncio.TimeoutError(), aiohttp.ClientConnectionError("refused")])
+def test_send_timeout_or_connection_error_is_not_responding(monkeypatch, exc):
+    session = _FakeSession(exc)
+
+    assert _send(monkeypatch, session) == {"status": "failed", "error": "Server not responding"}
+
+
+def test_send_without_server_skips_the_post(monkeypatch):
+    session = _FakeSession()
+    user = _TokenUser()
+    user.spawner.server = None
+
+    assert _send(monkeypatch, session, user) == {"status": "failed", "error": "Server not available"}
+    assert session.posts == []
+
+
+def test_fan_out_detail_rows_through_the_session(monkeypatch):
+    class _PerLabSession(_FakeSession):
+        def post(self, url, data=None, headers=None):
+            self.posts.append({"url": url})
+            if "bob" in url:
+                return _FakePost(asyncio.TimeoutError())
+            return _FakePost(_FakeResponse(200))
+
+    monkeypatch.setattr(notifications_mod, "_broadcast_client", lambda: _PerLabSession())
+    h, cap = _broadcast_handler(monkeypatch, [_TokenUser("alice"), _TokenUser("bob")])
+
+    asyncio.run(h.post())
+
+    assert cap["body"]["details"] == [
+        {"username": "alice", "status": "success"},
+        {"username": "bob", "status": "failed", "error": "Server not responding"},
+    ]
+
+
+# ── session shutdown ─────────────────────────────────────────────────────────
+
+def test_close_hook_awaits_session_close_on_its_loop(monkeypatch):
+    loop = asyncio.new_event_loop()
+    session = _FakeSession()
+    monkeypatch.setattr(notifications_mod, "_broadcast_session", session)
+    monkeypatch.setattr(notifications_mod, "_broadcast_loop", loop)
+    try:
+        notifications_mod._close_broadcast_client()
+    finally:
+        loop.close()
+
+    assert session.closed is True
+    assert notifications_mod._broadcast_session is None
+
+
+def test_close_hook_skips_when_loop_already_closed(monkeypatch):
+    loop = asyncio.new_event_loop()
+    loop.close()
+    session = _FakeSession()
+    monkeypatch.setattr(notifications_mod, "_broadcast_session", session)
+    monkeypatch.setattr(notifications_mod, "_broadcast_loop", loop)
+
+    notifications_mod._close_broadcast_client()  # must not raise
+
+    assert session.closed is False
+    assert notifications_mod._broadcast_session is None
+
+
+# ── broadcast token cache ────────────────────────────────────────────────────
+
+def test_token_reused_while_live(monkeypatch):
+    user = _TokenUser()
+    monkeypatch.setattr(notifications_mod.time, "monotonic", lambda: 1000.0)
+
+    first = notifications_mod._broadcast_token(user)
+    second = notifications_mod._broadcast_token(user)
+
+    assert first == second == "alice-token-1"
+    assert user.minted == 1
+
+
+def test_token_reminted_inside_expiry_margin(monkeypatch):
+    user = _TokenUser()
+    clock = [1000.0]
+    monkeypatch.setattr(notifications_mod.time, "monotonic", lambda: clock[0])
+    notifications_mod._broadcast_token(user)
+
+    ttl, margin = notifications_mod.BROADCAST_TOKEN_TTL, notifications_mod.BROADCAST_TOKEN_MARGIN
+    clock[0] = 1000.0 + ttl - margin - 1  # just before the margin: still cached
+    assert notifications_mod._broadcast_token(user) == "alice-token-1"
+    clock[0] = 1000.0 + ttl - margin  # inside the margin: mint a fresh one
+    assert notifications_mod._broadcast_token(user) == "alice-token-2"
+    assert user.minted == 2
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_rejected_token_evicted_and_reminted(monkeypatch, status):
+    user = _TokenUser()
+    rejected = _FakeSession(_FakeResponse(status, "Forbidden"))
+
+    assert _send(monkeypatch, rejected, user)["status"] == "failed"
+    assert "alice" not in notifications_mod._broadcast_tokens
+
+    accepted = _FakeSession(_FakeResponse(200))
+    assert _send(monkeypatch, accepted, user) == {"status": "success"}
+    assert accepted.posts[0]["headers"]["Authorization"] == "Bearer alice-token-2"
+
+
+def test_other_failures_keep_the_cached_token(monkeypatch):
+    user = _TokenUser()
+    _send(monkeypatch, _FakeSession(_FakeResponse(500, "Internal Server Error")), user)
+
+    accepted = _FakeSession(_FakeResponse(200))
+    _send(monkeypatch, accepted, user)
+
+    assert accepted.posts[0]["headers"]["Authorization"] == "Bearer alice-token-1"
+    assert user.minted == 1
+
+
+# ── fan-out concurrency cap ──────────────────────────────────────────────────
+
+def _counting_send(counter):
+    async def _send_notification(self, user, spawner, payload_bytes, summary):
+        counter["in_flight"] += 1
+        counter["peak"] = max(counter["peak"], counter["in_flight"])
+        await asyncio.sleep(0.01)
+        counter["in_flight"] -= 1
+        return {"status": "success"}
+    return _send_notification
+
+
+def test_in_flight_deliveries_capped_by_configured_limit(monkeypatch):
+    counter = {"in_flight": 0, "peak": 0}
+    monkeypatch.setattr(BroadcastNotificationHandler, "_send_notification", _counting_send(counter))
+    users = [_user(f"user{i}") for i in range(7)]
+    h, cap = _broadcast_handler(monkeypatch, users, config={"broadcast_concurrency": 2})
+
+    asyncio.run(h.post())
+
+    assert counter["peak"] == 2
+    assert cap["body"]["successful"] == 7
+
+
+def test_unset_limit_falls_back_to_default(monkeypatch):
+    counter = {"in_flight": 0, "peak": 0}
+    monkeypatch.setattr(BroadcastNotificationHandler, "_send_notification", _counting_send(counter))
+    monkeypatch.setattr(notifications_mod, "DEFAULT_BROADCAST_CONCURRENCY", 3)
+    users = [_user(f"user{i}") for i in range(7)]
+    h, _ = _broadcast_handler(monkeypatch, users)
+
+    asyncio.run(h.post())
+
+    assert counter["peak"] == 3
+
+
+# ── active-server lookup ─────────────────────────────────────────────────────
+
+class _Users(dict):
+    """Stands in for the hub's UserDict: indexing by a loaded orm.User wraps it
+    (no query); ``active`` names the users whose spawner reports active."""
+
+    def __init__(self, active):
+        super().__init__()
+        self.active = set(active)
+        self.wrapped = []
+
+    def __getitem__(self, orm_user):
+        self.wrapped.append(orm_user.name)
+        return SimpleNamespace(name=orm_user.name, spawner=SimpleNamespace(active=orm_user.name in self.active))
+
+
+@pytest.fixture
+def hub_db():
+    """In-memory DB with the JupyterHub tables (as in test_rename_sync.py)."""
+    from jupyterhub import orm as jh_orm
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine("sqlite://")
+    jh_orm.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for name, server, spawner_name in [
+        ("alice", True, ''), ("bob", True, ''), ("carol", False, ''), ("dave", True, 'gpu'), ("erin", None, None),
+    ]:
+        user = jh_orm.User(name=name)
+        if spawner_name is not None:
+            orm_spawner = jh_orm.Spawner(name=spawner_name)
+            if server:
+                orm_spawner.server = jh_orm.Server()
+            user._orm_spawners.append(orm_spawner)
+        session.add(user)
+    session.commit()
+    yield session
+    session.close()
+
+
+def _lookup_handler(cls, db, users):
+    h = cls.__new__(cls)
+    h.application = SimpleNamespace(settings={"log": _LOG, "db": db, "users": users})
+    h._jupyterhub_user = SimpleNamespace(admin=True, name="admin")
+    h.find_user = lambda name: pytest.fail(f"find_user({name!r}) re-queries the user")
+    return h
+
+
+def test_active_users_wraps_default_server_rows_only(hub_db):
+    users = _Users(active={"alice"})  # bob's server row is there but the spawner is stopping
+    h = _lookup_handler(BroadcastNotificationHandler, hub_db, users)
+
+    active = notifications_mod._active_users(h)
+
+    assert [u.name for u in active] == ["alice"]
+    assert sorted(users.wrapped) == ["alice", "bob"]  # no default server row -> never wrapped
+
+
+def test_active_users_recipient_filter_runs_in_sql(hub_db):
+    users = _Users(active={"alice", "bob"})
+    h = _lookup_handler(BroadcastNotificationHandler, hub_db, users)
+
+    active = notifications_mod._active_users(h, {"bob", "carol"})
+
+    assert [u.name for u in active] == ["bob"]
+    assert users.wrapped == ["bob"]
+
+
+def test_active_servers_lists_names_without_wrapping(hub_db):
+    users = _Users(active=set())
+    h = _lookup_handler(ActiveServersHandler, hub_db, users)
+    cap = {}
+    h.finish = lambda body=None: cap.__setitem__("body", body)
+
+    asyncio.run(h.get())
+
+    assert sorted(s["username"] for s in cap["body"]["servers"]) == ["alice", "bob"]
+    assert users.wrapped == []
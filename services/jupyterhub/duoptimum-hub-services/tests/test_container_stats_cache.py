@@ -71,6 +71,47 @@ def test_stats_from_container_none_on_error():
     assert stats_from_container(c) is None
 
 
+class _OneShotContainer(_FakeContainer):
+    """Daemon with one-shot support: the one-shot payload carries no precpu cycle."""
+
+    def __init__(self, stats, attrs):
+        super().__init__(stats, attrs)
+        self.calls = []
+
+    def stats(self, stream=False, one_shot=None):
+        self.calls.append(one_shot)
+        if one_shot:
+            return {k: v for k, v in self._stats.items() if k != "precpu_stats"}
+        return self._stats
+
+
+def test_stats_from_container_exposes_cpu_sample():
+    out = stats_from_container(_FakeContainer(_stats_payload(), {"HostConfig": {}}))
+    assert out["cpu_sample"] == {"cpu_usage": {"total_usage": 200}, "system_cpu_usage": 2000}
+
+
+def test_one_shot_deltas_against_previous_sample():
+    # previous reading total=150/system=1500 -> delta 50/500, 4 cpus -> 40%
+    c = _OneShotContainer(_stats_payload(), {"HostConfig": {}})
+    prev = {"cpu_usage": {"total_usage": 150}, "system_cpu_usage": 1500}
+    out = stats_from_container(c, previous_cpu=prev)
+    assert c.calls == [True], "one-shot read only, no two-cycle sample"
+    assert out["cpu_percent"] == 40.0
+
+
+def test_no_previous_sample_uses_two_cycle_read():
+    c = _OneShotContainer(_stats_payload(), {"HostConfig": {}})
+    assert stats_from_container(c)["cpu_percent"] == 40.0
+    assert c.calls == [None]
+
+
+def test_one_shot_unsupported_falls_back_to_two_cycle_read():
+    # _FakeContainer.stats() takes no one_shot kwarg, like a pre-1.41 daemon refusing it
+    c = _FakeContainer(_stats_payload(), {"HostConfig": {}})
+    prev = {"cpu_usage": {"total_usage": 0}, "system_cpu_usage": 0}
+    assert stats_from_container(c, previous_cpu=prev)["cpu_percent"] == 40.0
+
+
 # ── snapshot staleness + trigger gating ──────────────────────────────────────
 
 @pytest.fixture(autouse=True)
@@ -140,3 +181,99 @@ def test_no_refresh_while_already_refreshing(fake_executor):
     csc._container_stats_cache['refreshing'] = True
     csc.get_container_stats_with_refresh({"alice"})
     assert fake_executor.submitted == []
+
+
+def test_previous_cpu_sample_only_when_recent(monkeypatch):
+    import time
+    sample = {"cpu_usage": {"total_usage": 1}, "system_cpu_usage": 2}
+    csc._container_stats_cache['data']['alice'] = {"cpu_sample": sample, "sampled_at": time.monotonic()}
+    assert csc._previous_cpu_sample('alice') == sample
+    csc._container_stats_cache['data']['alice']['sampled_at'] = time.monotonic() - 3600
+    assert csc._previous_cpu_sample('alice') is None, "stale baseline would average over the idle gap"
+    assert csc._previous_cpu_sample('bob') is None
+
+
+def test_refresh_skips_while_lock_held(monkeypatch):
+    # a refresh already running holds the lock; a second one returns without docker work
+    import duoptimum_hub_services.docker_utils as du
+    monkeypatch.setattr(du, "get_shared_docker_api_client",
+                        lambda **kw: pytest.fail("second refresh must not touch docker"))
+    assert csc._refresh_lock.acquire(blocking=False)
+    try:
+        csc._refresh_active_container_stats({"alice"})
+    finally:
+        csc._refresh_lock.release()
+    assert csc._container_stats_cache['refreshing'] is False
+
+
+def test_refresh_releases_lock_on_error(monkeypatch):
+    import duoptimum_hub_services.docker_utils as du
+
+    def _boom(**kw):
+        raise RuntimeError("docker down")
+
+    monkeypatch.setattr(du, "get_shared_docker_api_client", _boom)
+    csc._refresh_active_container_stats({"alice"})
+    assert not csc._refresh_lock.locked()
+    assert csc._container_stats_cache['refreshing'] is False
+
+
+class _FakeListing:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class _FakeStatsAPI:
+    def __init__(self, containers):
+        self._containers = containers
+
+    def _url(self, path):
+        return path
+
+    def _get(self, url):
+        return _FakeListing(self._containers)
+
+
+class _FakeModelContainer:
+    def __init__(self, attrs):
+        self.attrs = attrs
+
+    def stats(self, stream=False, one_shot=False):
+        return _stats_payload()
+
+
+class _FakeContainers:
+    def __init__(self):
+        self.inspected = []
+
+    def get(self, ref):
+        self.inspected.append(ref)
+        return _FakeModelContainer({"Id": ref, "HostConfig": {}, "Image": "sha256:lab"})
+
+    def prepare_model(self, attrs):
+        return _FakeModelContainer(attrs)
+
+
+def test_refresh_inspects_each_container_once(monkeypatch):
+    # repeat refreshes rebuild the model from the kept attrs: stats only, no re-inspect
+    import types
+
+    import duoptimum_hub_services.docker_utils as du
+    api = _FakeStatsAPI([{"Id": "c1", "Names": ["/jupyterlab-alice"]}])
+    containers = _FakeContainers()
+    monkeypatch.setattr(du, "get_shared_docker_api_client", lambda **kw: api)
+    monkeypatch.setattr(du, "get_shared_docker_client",
+                        lambda **kw: types.SimpleNamespace(containers=containers))
+    monkeypatch.setattr(csc, "_container_attrs", {})
+
+    csc._refresh_active_container_stats({"alice"})
+    csc._refresh_active_container_stats({"alice"})
+    assert containers.inspected == ["c1"]
+    assert csc._container_stats_cache['data']['alice']['image_id'] == "sha256:lab"
+
+    api._containers = []  # container gone -> its attrs are pruned
+    csc._refresh_active_container_stats({"alice"})
+    assert csc._container_attrs == {}
@@ -551,3 +551,55 @@ class TestDockerClientHelper:
         seen = self._spy(monkeypatch)
         du.get_docker_api_client(timeout=30)
         assert seen == {"base_url": du.DOCKER_SOCKET_URL, "timeout": 30}
+
+
+class TestSharedDockerClient:
+    """Hot paths (stats sampling, volume df) reuse one client per (kind, timeout)
+    instead of opening and closing a socket client on every call."""
+
+    @staticmethod
+    def _counting(monkeypatch):
+        import duoptimum_hub_services.docker_utils as du
+        built = []
+
+        class _C:
+            def __init__(self, **kw):
+                self.kw = kw
+                self.closed = False
+                built.append(self)
+
+            def close(self):
+                self.closed = True
+
+        monkeypatch.setitem(sys.modules, "docker", SimpleNamespace(DockerClient=_C, APIClient=_C))
+        du.close_shared_docker_clients()
+        return du, built
+
+    def test_reused_across_calls(self, monkeypatch):
+        du, built = self._counting(monkeypatch)
+        assert du.get_shared_docker_client() is du.get_shared_docker_client()
+        assert du.get_shared_docker_api_client(timeout=30) is du.get_shared_docker_api_client(timeout=30)
+        assert len(built) == 2
+        du.close_shared_docker_clients()
+
+    def test_keyed_by_timeout(self, monkeypatch):
+        du, built = self._counting(monkeypatch)
+        assert du.get_shared_docker_api_client(timeout=30) is not du.get_shared_docker_api_client(timeout=360)
+        assert [c.kw["timeout"] for c in built] == [30, 360]
+        du.close_shared_docker_clients()
+
+    def test_close_closes_and_forgets(self, monkeypatch):
+        du, built = self._counting(monkeypatch)
+        first = du.get_shared_docker_client()
+        du.close_shared_docker_clients()
+        assert first.closed is True
+        assert du.get_shared_docker_client() is not first
+        du.close_shared_docker_clients()
+
+
+def test_first_refresh_delay_bounded():
+    """The staggered first refresh waits at most a quarter interval, never over 30s."""
+    from duoptimum_hub_services.docker_utils import first_refresh_delay
+    for _ in range(50):
+        assert 0 <= first_refresh_delay(20) <= 5
+        assert 0 <= first_refresh_delay(3600) <= 30
@@ -33,47 +33,58 @@ _LOG = logging.getLogger("test_handler_async")
 class _FakeClient:
     """Fake docker client; records close() and raises the seeded error on get."""
 
-    def __init__(self, container=None, volume=None, raise_on_get=None):
+    def __init__(self, container=None, raise_on_get=None):
         self.closed = False
         self._raise = raise_on_get
         self.containers = SimpleNamespace(get=self._get_container)
-        self.volumes = SimpleNamespace(get=self._get_volume)
         self._container = container
-        self._volume = volume
 
     def _get_container(self, name):
         if self._raise:
             raise self._raise
         return self._container
 
-    def _get_volume(self, name):
-        if self._raise:
-            raise self._raise
-        return self._volume
-
     def close(self):
         self.closed = True
 
 
-class _FakeContainer:
-    def __init__(self, holder):
+class _FakeAPIClient:
+    """Fake low-level APIClient: restart / volumes / remove_volume record their thread."""
+
+    def __init__(self, holder, volumes=(), raise_on=None):
         self._h = holder
+        self._volumes = list(volumes)
+        self._raise = raise_on
+        self.closed = False
+        self.volume_filters = []
 
-    def restart(self, timeout=None):
+    def restart(self, container, timeout=None):
         self._h["thread"] = threading.get_ident()
         self._h["timeout"] = timeout
+        if self._raise:
+            raise self._raise
 
-    def logs(self, tail=None, **kw):
+    def volumes(self, filters=None):
+        self.volume_filters.append(filters)
+        return {"Volumes": [{"Name": n} for n in self._volumes] or None}
+
+    def remove_volume(self, name):
         self._h["thread"] = threading.get_ident()
-        return b"line-a\nline-b\nline-c"
+        self._h.setdefault("removed", []).append(name)
+        if self._raise:
+            raise self._raise
+
+    def close(self):
+        self.closed = True
 
 
-class _FakeVolume:
+class _FakeContainer:
     def __init__(self, holder):
         self._h = holder
 
-    def remove(self):
+    def logs(self, tail=None, **kw):
         self._h["thread"] = threading.get_ident()
+        return b"line-a\nline-b\nline-c"
 
 
 # ── restart ──────────────────────────────────────────────────────────────────
@@ -91,8 +102,8 @@ def _restart_handler():
 
 def test_restart_offloads_blocking_call(monkeypatch):
     holder = {}
-    client = _FakeClient(container=_FakeContainer(holder))
-    monkeypatch.setattr(server_mod, "get_docker_client", lambda: client)
+    client = _FakeAPIClient(holder)
+    monkeypatch.setattr(server_mod, "get_shared_docker_api_client", lambda: client)
     h, cap = _restart_handler()
 
     asyncio.run(h.post("alice"))
@@ -100,33 +111,33 @@ def test_restart_offloads_blocking_call(monkeypatch):
     assert cap["status"] == 200
     assert "successfully restarted" in cap["body"]["message"]
     assert holder["timeout"] == 10  # restart(timeout=10) preserved
-    assert client.closed is True
+    assert client.closed is False  # shared client outlives the request
     # the fix: the blocking restart ran on an executor thread, not this one
     assert holder["thread"] != threading.get_ident()
 
 
-def test_restart_not_found_maps_404_and_closes(monkeypatch):
-    client = _FakeClient(raise_on_get=docker.errors.NotFound("nope"))
-    monkeypatch.setattr(server_mod, "get_docker_client", lambda: client)
+def test_restart_not_found_maps_404(monkeypatch):
+    client = _FakeAPIClient({}, raise_on=docker.errors.NotFound("nope"))
+    monkeypatch.setattr(server_mod, "get_shared_docker_api_client", lambda: client)
     h, _ = _restart_handler()
 
     with pytest.raises(web.HTTPError) as ei:
         asyncio.run(h.post("alice"))
 
     assert ei.value.status_code == 404
-    assert client.closed is True  # finally ran on the error path
+    assert client.closed is False  # not closed on the error path either
 
 
 def test_restart_api_error_maps_500(monkeypatch):
-    client = _FakeClient(raise_on_get=docker.errors.APIError("boom"))
-    monkeypatch.setattr(server_mod, "get_docker_client", lambda: client)
+    client = _FakeAPIClient({}, raise_on=docker.errors.APIError("boom"))
+    monkeypatch.setattr(server_mod, "get_shared_docker_api_client", lambda: client)
     h, _ = _restart_handler()
 
     with pytest.raises(web.HTTPError) as ei:
         asyncio.run(h.post("alice"))
 
     assert ei.value.status_code == 500
-    assert client.closed is True
+    assert client.closed is False  # shared client outlives the request
 
 
 # ── logs ─────────────────────────────────────────────────────────────────────
@@ -145,26 +156,26 @@ def _logs_handler():
 def test_logs_offloads_and_returns_tail(monkeypatch):
     holder = {}
     client = _FakeClient(container=_FakeContainer(holder))
-    monkeypatch.setattr(server_mod, "get_docker_client", lambda: client)
+    monkeypatch.setattr(server_mod, "get_shared_docker_client", lambda: client)
     h, cap = _logs_handler()
 
     asyncio.run(h.get("alice"))
 
     assert cap["body"] == {"lines": ["line-a", "line-b", "line-c"]}
-    assert client.closed is True
+    assert client.closed is False  # shared client outlives the request
     assert holder["thread"] != threading.get_ident()
 
 
 def test_logs_not_found_maps_404(monkeypatch):
     client = _FakeClient(raise_on_get=docker.errors.NotFound("nope"))
-    monkeypatch.setattr(server_mod, "get_docker_client", lambda: client)
+    monkeypatch.setattr(server_mod, "get_shared_docker_client", lambda: client)
     h, _ = _logs_handler()
 
     with pytest.raises(web.HTTPError) as ei:
         asyncio.run(h.get("alice"))
 
     assert ei.value.status_code == 404
-    assert client.closed is True
+    assert client.closed is False  # shared client outlives the request
 
 
 # ── volume delete ────────────────────────────────────────────────────────────
@@ -192,8 +203,8 @@ def _delete_handler(body):
 
 def test_delete_offloads_removal(monkeypatch):
     holder = {}
-    client = _FakeClient(volume=_FakeVolume(holder))
-    monkeypatch.setattr(volumes_mod, "get_docker_client", lambda: client)
+    client = _FakeAPIClient(holder, volumes=["jupyterlab-alice_home", "jupyterlab-alice_cache"])
+    monkeypatch.setattr(volumes_mod, "get_shared_docker_api_client", lambda: client)
     monkeypatch.setattr(volumes_mod, "record_event", lambda *a, **k: None)
     h, cap = _delete_handler({"volumes": ["home"]})
 
@@ -202,13 +213,16 @@ def test_delete_offloads_removal(monkeypatch):
     assert cap["status"] == 200
     assert cap["body"]["reset_volumes"] == ["home"]
     assert cap["body"]["failed_volumes"] == []
-    assert client.closed is True
+    assert client.closed is False  # shared client outlives the request
     assert holder["thread"] != threading.get_ident()
+    assert client.volume_filters == [{"name": "alice"}]  # one list call, no per-volume get
+    assert holder["removed"] == ["jupyterlab-alice_home"]  # only the requested volume
 
 
 def test_delete_missing_volume_reported_not_raised(monkeypatch):
-    client = _FakeClient(raise_on_get=docker.errors.NotFound("gone"))
-    monkeypatch.setattr(volumes_mod, "get_docker_client", lambda: client)
+    holder = {}
+    client = _FakeAPIClient(holder)  # list returns nothing for this user
+    monkeypatch.setattr(volumes_mod, "get_shared_docker_api_client", lambda: client)
     monkeypatch.setattr(volumes_mod, "record_event", lambda *a, **k: None)
     h, cap = _delete_handler({"volumes": ["home"]})
 
@@ -217,7 +231,31 @@ def test_delete_missing_volume_reported_not_raised(monkeypatch):
     assert cap["status"] == 200
     assert cap["body"]["reset_volumes"] == []
     assert cap["body"]["failed_volumes"] == [{"volume": "home", "reason": "not found"}]
-    assert client.closed is True
+    assert client.closed is False  # shared client outlives the request
+    assert "removed" not in holder  # nothing to remove -> no remove call
+
+
+def test_delete_removes_concurrently_and_classifies_errors(monkeypatch):
+    holder = {}
+    client = _FakeAPIClient(holder, volumes=["jupyterlab-alice_home", "jupyterlab-alice_cache"])
+    started = threading.Barrier(2, timeout=5)
+
+    def _remove(name):
+        started.wait()  # both removes must be in flight at once to get past this
+        holder.setdefault("removed", []).append(name)
+        if name.endswith("_cache"):
+            raise docker.errors.APIError("in use")
+
+    client.remove_volume = _remove
+    monkeypatch.setattr(volumes_mod, "get_shared_docker_api_client", lambda: client)
+    monkeypatch.setattr(volumes_mod, "record_event", lambda *a, **k: None)
+    h, cap = _delete_handler({"volumes": ["home", "cache"]})
+
+    asyncio.run(h.delete("alice"))
+
+    assert sorted(holder["removed"]) == ["jupyterlab-alice_cache", "jupyterlab-alice_home"]
+    assert cap["body"]["reset_volumes"] == ["home"]
+    assert cap["body"]["failed_volumes"] == [{"volume": "cache", "reason": "in use"}]
 
 
 # ── volume list (GET) ────────────────────────────────────────────────────────
@@ -271,14 +309,14 @@ def test_get_lists_volumes_offloaded(monkeypatch):
     present = {"jupyterlab-alice_home": _FakeVol(), "jupyterlab-alice_cache": _FakeVol()}
     holder = {}
     client = _FakeListClient(present, holder)
-    monkeypatch.setattr(volumes_mod, "get_docker_client", lambda: client)
+    monkeypatch.setattr(volumes_mod, "get_shared_docker_client", lambda: client)
     h, cap = _list_handler(templates)
 
     asyncio.run(h.get("alice"))
 
     assert cap["status"] == 200
     assert [v["name"] for v in cap["body"]["volumes"]] == ["jupyterlab-alice_home", "jupyterlab-alice_cache"]
-    assert client.closed is True
+    assert client.closed is False  # shared client outlives the request
     # every Docker read ran on an executor thread, not the event loop thread
     assert holder["threads"] and all(t != threading.get_ident() for t in holder["threads"])
 
@@ -287,7 +325,7 @@ def test_get_skips_missing_volume(monkeypatch):
     templates = {"home": "jupyterlab-{username}_home", "cache": "jupyterlab-{username}_cache"}
     present = {"jupyterlab-alice_home": _FakeVol()}  # cache absent
     client = _FakeListClient(present, {})
-    monkeypatch.setattr(volumes_mod, "get_docker_client", lambda: client)
+    monkeypatch.setattr(volumes_mod, "get_shared_docker_client", lambda: client)
     h, cap = _list_handler(templates)
 
     asyncio.run(h.get("alice"))
@@ -300,7 +338,7 @@ def test_get_appends_shared_row_when_volume_present(monkeypatch):
     present = {"jupyterlab-alice_home": _FakeVol(), "shared_vol": _FakeVol()}
     holder = {}
     client = _FakeListClient(present, holder)
-    monkeypatch.setattr(volumes_mod, "get_docker_client", lambda: client)
+    monkeypatch.setattr(volumes_mod, "get_shared_docker_client", lambda: client)
     h, cap = _list_handler(templates)
     # bypass the ORM/policy resolution (covered separately); assert the offloaded
     # existence check + append behaviour
@@ -316,7 +354,7 @@ def test_get_omits_shared_row_when_volume_absent(monkeypatch):
     templates = {"home": "jupyterlab-{username}_home"}
     present = {"jupyterlab-alice_home": _FakeVol()}  # shared vol NOT present
     client = _FakeListClient(present, {})
-    monkeypatch.setattr(volumes_mod, "get_docker_client", lambda: client)
+    monkeypatch.setattr(volumes_mod, "get_shared_docker_client", lambda: client)
     h, cap = _list_handler(templates)
     h._resolve_shared_row = lambda u: {"name": "absent_shared", "row": {"suffix": "shared", "name": "absent_shared"}}
 
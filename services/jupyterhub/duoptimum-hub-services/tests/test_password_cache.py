@@ -2,7 +2,12 @@
 
 from unittest.mock import patch
 
-from duoptimum_hub_services.password_cache import cache_password, get_cached_password, clear_cached_password
+from duoptimum_hub_services.password_cache import (
+    cache_password,
+    clear_cached_password,
+    get_cached_password,
+    get_cached_passwords,
+)
 
 
 class TestPasswordCache:
@@ -19,16 +24,12 @@ class TestPasswordCache:
         """Expired entry returns None."""
         cache_password("bob", "pass456")
 
-        with patch("duoptimum_hub_services.password_cache.time") as mock_time:
-            # First call is cache_password's time.time(), already done above
-            # Simulate 301 seconds later (> 300s TTL)
-            mock_time.time.return_value = 9999999999.0
-
-            from duoptimum_hub_services.password_cache import _password_cache
-            # Overwrite timestamp to a known value
-            _password_cache["bob"] = ("pass456", 1000.0)
-            mock_time.time.return_value = 1301.0  # 301s after cache time
+        from duoptimum_hub_services.password_cache import _password_cache
+        # Overwrite timestamp to a known value
+        _password_cache["bob"] = ("pass456", 1000.0)
 
+        with patch("duoptimum_hub_services.password_cache.coarse_now", return_value=1301.0):
+            # 301s after cache time (> 300s TTL)
             assert get_cached_password("bob") is None
 
     def test_clear_removes_entry(self, clean_password_cache):
@@ -42,3 +43,13 @@ class TestPasswordCache:
         cache_password("dave", "old_pass")
         cache_password("dave", "new_pass")
         assert get_cached_password("dave") == "new_pass"
+
+    def test_bulk_lookup_skips_missing_and_expired(self, clean_password_cache):
+        """Bulk lookup returns live entries only and evicts the expired ones."""
+        from duoptimum_hub_services.password_cache import _password_cache
+        _password_cache["fay"] = ("live", 1000.0)
+        _password_cache["gus"] = ("stale", 600.0)
+
+        with patch("duoptimum_hub_services.password_cache.coarse_now", return_value=1200.0):
+            assert get_cached_passwords(["fay", "gus", "nobody"]) == {"fay": "live"}
+        assert "gus" not in _password_cache
@@ -40,6 +40,7 @@ def _original(env):
         "idle_culler_max_extension": xmin // 60,
         "activitymon_target_hours": int(g("JUPYTERHUB_ACTIVITYMON_TARGET_HOURS", 8)),
         "activitymon_sample_interval": int(g("JUPYTERHUB_ACTIVITYMON_SAMPLE_INTERVAL", 600)),
+        "broadcast_concurrency": int(g("JUPYTERHUB_BROADCAST_CONCURRENCY", 32)),
         "hub_docker_api_timeout": int(g("JUPYTERHUB_HUB_DOCKER_API_TIMEOUT", 360)),
         "lab_container_max_extra_space_gb": int(g("JUPYTERHUB_LAB_CONTAINER_MAX_EXTRA_SPACE_GB", 10)),
         "lab_volume_max_total_size_gb": int(g("JUPYTERHUB_LAB_VOLUME_MAX_TOTAL_SIZE_GB", 50)),
@@ -116,6 +117,7 @@ def test_matches_original_sample_env(monkeypatch):
         "JUPYTERHUB_IDLE_CULLER_MAX_EXTENSION_MINUTES": "180",
         "JUPYTERHUB_ACTIVITYMON_TARGET_HOURS": "6",
         "JUPYTERHUB_ACTIVITYMON_SAMPLE_INTERVAL": "900",
+        "JUPYTERHUB_BROADCAST_CONCURRENCY": "8",
         "JUPYTERHUB_HUB_DOCKER_API_TIMEOUT": "120",
         "JUPYTERHUB_LAB_CONTAINER_MAX_EXTRA_SPACE_GB": "5",
         "JUPYTERHUB_LAB_VOLUME_MAX_TOTAL_SIZE_GB": "25",
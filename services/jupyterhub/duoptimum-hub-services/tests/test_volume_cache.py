@@ -13,6 +13,7 @@ import pytest
 from duoptimum_hub_services import volume_cache as vc
 from duoptimum_hub_services import container_size_cache as czc
 from duoptimum_hub_services import container_stats_cache as csc
+from duoptimum_hub_services import docker_utils as du
 
 
 @pytest.fixture
@@ -139,6 +140,15 @@ def _patch_df(monkeypatch, volumes):
     monkeypatch.setattr(docker, "APIClient", _FakeAPIClient)
 
 
+@pytest.fixture(autouse=True)
+def _fresh_shared_clients():
+    # df goes through the process-wide shared APIClient; drop it around each test so
+    # a fake installed by one test never leaks into the next
+    du.close_shared_docker_clients()
+    yield
+    du.close_shared_docker_clients()
+
+
 class TestDfCompleteness:
     def test_all_computed_is_complete(self, monkeypatch):
         vc.configure_volume_cache(TEMPLATES)
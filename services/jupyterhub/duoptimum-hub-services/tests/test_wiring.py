@@ -171,7 +171,7 @@ def test_stellars_config_key_set_and_lab_volumes():
     s = SimpleNamespace(
         label_volume_role_key="role", label_volume_description="desc",
         idle_culler_enabled=1, idle_culler_timeout=100, idle_culler_max_extension=2,
-        lab_container_max_extra_space_gb=10, lab_volume_max_total_size_gb=50,
+        broadcast_concurrency=8, lab_container_max_extra_space_gb=10, lab_volume_max_total_size_gb=50,
         lab_memory_max_usage_mb=4096, lab_image="img", lab_user_env_enable=1,
     )
     r = SimpleNamespace(gpu_list=[{"index": 0}], gpu_enabled=1, gpu_isolation_enforced=True)
@@ -187,12 +187,13 @@ def test_stellars_config_key_set_and_lab_volumes():
         "user_volume_suffixes", "user_volume_name_templates", "user_volume_roles",
         "volume_role_label_key", "volume_description_label_key", "user_volumes",
         "idle_culler_enabled", "idle_culler_timeout", "idle_culler_max_extension",
-        "gpu_list", "gpu_available", "gpu_isolation_enforced", "host_status_provider",
+        "broadcast_concurrency", "gpu_list", "gpu_available", "gpu_isolation_enforced", "host_status_provider",
         "container_max_extra_space_mb", "volume_max_total_size_mb", "memory_max_usage_mb",
         "reserved_env_var_names", "reserved_env_var_prefixes", "lab_user_env_enable",
         "shared_volume_name", "lab_image", "lab_volumes",
     }
     assert got["gpu_available"] is True
+    assert got["broadcast_concurrency"] == 8  # JUPYTERHUB_BROADCAST_CONCURRENCY -> handler fan-out cap
     assert got["container_max_extra_space_mb"] == 10240
     assert got["host_status_provider"] == "HSP"
     # lab_volumes maps each user volume's name_template through docker_spawner_volumes